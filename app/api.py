@@ -10,7 +10,6 @@ Exposes REST endpoints for the React dashboard:
 """
 
 import logging
-import json
 import uuid
 import asyncio
 from datetime import datetime, timezone
@@ -22,11 +21,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
+import orjson
 import os
 
 from app.config import settings
 from app.elastic_client import elastic_agent_client
 from app.graph.graph import run_investigation, stream_investigation
+from app.graph.nodes import clear_knowledge_cache, close_es_client, warm_up_backends
 
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
@@ -72,6 +73,7 @@ class SignalResponse(BaseModel):
 class ReportResponse(BaseModel):
     drug_name: str
     reaction_term: str
+    reaction_terms: List[str] = []
     risk_level: str
     report_markdown: str
 
@@ -104,10 +106,14 @@ async def lifespan(app: FastAPI):
         logger.info(f"Agents available: {len(agents)}")
         logger.info(f"Tools available: {len(tools)}")
 
+    # Open knowledge-base and Groq connections before the first query
+    await warm_up_backends()
+
     yield
 
     logger.info("Shutting down SignalShield AI...")
     await elastic_agent_client.close()
+    await close_es_client()
 
 
 # ── FastAPI App ──────────────────────────────────────────
@@ -208,8 +214,21 @@ async def start_investigation(request: InvestigateRequest):
 
 async def _run_investigation_background(investigation_id: str, query: str, conversation_history: list[dict] = None):
     """Background task to run the multi-agent investigation."""
+    # Ids of reasoning steps already pushed mid-node, so the node's final
+    # update doesn't broadcast them a second time
+    streamed_steps = set()
+
     try:
-        async for event in stream_investigation(query=query, investigation_id=investigation_id, conversation_history=conversation_history or []):
+        async for mode, event in stream_investigation(query=query, investigation_id=investigation_id, conversation_history=conversation_history or []):
+            if mode == "custom":
+                streamed_steps.update(s["id"] for s in event["steps"])
+                await _broadcast_progress(investigation_id, {
+                    "type": "reasoning",
+                    "node": event["node"],
+                    "steps": event["steps"],
+                })
+                continue
+
             # event is a dict with node_name -> state_update
             for node_name, state_update in event.items():
                 logger.info(f"[{investigation_id}] Node '{node_name}' completed")
@@ -251,11 +270,15 @@ async def _run_investigation_background(investigation_id: str, query: str, conve
                 })
 
                 # Broadcast reasoning trace events separately for real-time UI
-                if reasoning_steps:
+                fresh_steps = [
+                    s for s in reasoning_steps
+                    if s["id"] not in streamed_steps
+                ]
+                if fresh_steps:
                     await _broadcast_progress(investigation_id, {
                         "type": "reasoning",
                         "node": node_name,
-                        "steps": reasoning_steps,
+                        "steps": fresh_steps,
                     })
 
     except Exception as e:
@@ -319,6 +342,7 @@ async def list_reports():
                 "investigation_id": inv["id"],
                 "drug_name": report.get("drug_name"),
                 "reaction_term": report.get("reaction_term"),
+                "reaction_terms": report.get("reaction_terms", [report.get("reaction_term")]),
                 "risk_level": report.get("risk_level"),
                 "has_report": bool(report.get("report_markdown")),
             })
@@ -339,6 +363,12 @@ async def get_report(investigation_id: str, drug_name: str):
     raise HTTPException(status_code=404, detail=f"No report found for {drug_name}")
 
 
+@app.post("/api/knowledge/cache/clear")
+async def clear_knowledge_answers():
+    """Drop cached knowledge answers (call after re-indexing pharma_knowledge)."""
+    return {"status": "cleared", "entries": clear_knowledge_cache()}
+
+
 # ── WebSocket for Real-time Progress ─────────────────────
 
 @app.websocket("/ws/progress/{investigation_id}")
@@ -356,17 +386,18 @@ async def websocket_progress(websocket: WebSocket, investigation_id: str):
     # Send current state if investigation exists
     inv = investigations_store.get(investigation_id)
     if inv:
-        await websocket.send_json({
+        await websocket.send_text(orjson.dumps({
             "type": "current_state",
             "data": {
                 "status": inv["status"],
+                "route": inv.get("route", ""),
                 "signals_count": len(inv.get("signals", [])),
                 "investigations_count": len(inv.get("investigations", [])),
                 "reports_count": len(inv.get("reports", [])),
                 "progress": inv.get("progress", []),
                 "reasoning_trace": inv.get("reasoning_trace", []),
             },
-        })
+        }).decode())
 
     try:
         while True:
@@ -382,10 +413,12 @@ async def _broadcast_progress(investigation_id: str, data: dict):
     """Broadcast progress update to all WebSocket clients for an investigation."""
     clients = active_websockets.get(investigation_id, [])
     disconnected = []
+    # Serialize once for every listener
+    payload = orjson.dumps({"type": "progress", "data": data}).decode()
 
     for ws in clients:
         try:
-            await ws.send_json({"type": "progress", "data": data})
+            await ws.send_text(payload)
         except Exception:
             disconnected.append(ws)
 
@@ -22,10 +22,12 @@ class Settings(BaseSettings):
     # LLM (Groq — hardware-accelerated inference)
     groq_api_key: str = ""
     groq_model: str = "llama-3.3-70b-versatile"
+    groq_fast_model: str = "llama-3.1-8b-instant"  # Greetings and out-of-scope redirects
 
     # App settings
     log_level: str = "INFO"
     faers_record_count: int = 500_000
+    agent_max_concurrency: int = 6  # In-flight Agent Builder Converse calls
 
     model_config = {
         "env_file": str(ENV_FILE),
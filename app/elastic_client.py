@@ -6,10 +6,10 @@ Handles authentication, streaming responses, and response parsing.
 
 import asyncio
 import logging
-import json
 from typing import Optional
 
 import httpx
+import orjson
 
 from app.config import settings
 
@@ -27,6 +27,9 @@ class ElasticAgentClient:
         self.kibana_url = (kibana_url or settings.kibana_url).rstrip("/")
         self.api_key = api_key or settings.kibana_api_key
         self._client: Optional[httpx.AsyncClient] = None
+        # Caps concurrent Converse calls across all nodes/requests — unbounded
+        # fan-out just turns into 429 retries that serialize worse
+        self._converse_slots = asyncio.Semaphore(settings.agent_max_concurrency)
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -69,26 +72,29 @@ class ElasticAgentClient:
         logger.info(f"Sending to agent '{agent_id}': {message[:100]}...")
 
         # Retry up to 3 times on 429 rate limit errors
-        for attempt in range(3):
-            resp = await client.post(
-                "/api/agent_builder/converse",
-                json=payload,
-            )
-            if resp.status_code == 429:
-                retry_after = int(resp.headers.get("retry-after", 20))
-                logger.warning(f"Rate limited (429). Waiting {retry_after}s before retry {attempt+1}/3...")
-                await asyncio.sleep(retry_after)
-                continue
-            break  # success or non-429 error
+        async with self._converse_slots:
+            for attempt in range(3):
+                resp = await client.post(
+                    "/api/agent_builder/converse",
+                    json=payload,
+                )
+                if resp.status_code == 429:
+                    retry_after = int(resp.headers.get("retry-after", 20))
+                    logger.warning(f"Rate limited (429). Waiting {retry_after}s before retry {attempt+1}/3...")
+                    await asyncio.sleep(retry_after)
+                    continue
+                break  # success or non-429 error
 
         if resp.status_code != 200:
             logger.error(f"Converse API error: {resp.status_code} {resp.text}")
             raise Exception(f"Agent Builder API error: {resp.status_code} — {resp.text}")
 
-        data = resp.json()
+        data = orjson.loads(resp.content)
         
         # LOG RAW RESPONSE FOR DEBUGGING
-        logger.info(f"RAW DATA FROM AGENT '{agent_id}': {json.dumps(data)[:5000]}")
+        if logger.isEnabledFor(logging.INFO):
+            raw_dump = orjson.dumps(data)[:5000].decode(errors="ignore")
+            logger.info(f"RAW DATA FROM AGENT '{agent_id}': {raw_dump}")
 
         # The response structure can vary.
         # Primary: data["response"]["message"] (standard Agent Builder format)
@@ -137,6 +143,25 @@ class ElasticAgentClient:
 
         return result
 
+    async def converse_batch(
+        self,
+        agent_id: str,
+        messages: list[str],
+    ) -> list:
+        """Send several independent messages to one agent concurrently.
+
+        Agent Builder has no multi-message endpoint, so each message is its
+        own Converse call (and its own conversation) over the shared client.
+
+        Returns:
+            One result per message, in order — the converse() dict, or the
+            exception raised for that message
+        """
+        return await asyncio.gather(
+            *[self.converse(agent_id=agent_id, message=message) for message in messages],
+            return_exceptions=True,
+        )
+
     async def converse_streaming(
         self,
         agent_id: str,
@@ -177,8 +202,8 @@ class ElasticAgentClient:
                     line = line.strip()
                     if line:
                         try:
-                            yield json.loads(line)
-                        except json.JSONDecodeError:
+                            yield orjson.loads(line)
+                        except orjson.JSONDecodeError:
                             yield {"type": "text", "content": line}
 
     async def list_agents(self) -> list[dict]:
@@ -216,6 +241,18 @@ class ElasticAgentClient:
         except Exception as e:
             return {"status": "unreachable", "error": str(e)}
 
+    async def warm_up(self) -> None:
+        """Open a pooled keep-alive connection to Kibana ahead of a Converse call.
+
+        Idempotent and best-effort: the TLS handshake is paid here, overlapped
+        with other work, instead of on the first agent request.
+        """
+        try:
+            client = await self._get_client()
+            await client.get("/api/status")
+        except Exception as e:
+            logger.debug(f"Agent Builder warm-up failed: {e}")
+
     async def close(self):
         if self._client and not self._client.is_closed:
             await self._client.aclose()
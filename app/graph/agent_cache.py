@@ -0,0 +1,81 @@
+"""Response cache for stateless Agent Builder calls.
+
+Scanner, investigator and reporter calls are deterministic enough that an
+identical (agent, message) pair within a few minutes can reuse the previous
+answer instead of paying another multi-second agent round-trip.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+
+from app.elastic_client import elastic_agent_client
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever agent instructions or node message templates change so stale
+# answers produced under the old prompts are never served
+PROMPT_VERSION = "v2"
+
+_response_cache: TTLCache = TTLCache(maxsize=1024, ttl=600)
+
+
+def _cache_key(agent_id: str, message: str) -> str:
+    return hashlib.sha256(f"{agent_id}|{PROMPT_VERSION}|{message}".encode()).hexdigest()
+
+
+async def cached_converse(
+    agent_id: str,
+    message: str,
+    conversation_id: Optional[str] = None,
+) -> dict:
+    """Drop-in for elastic_agent_client.converse with a TTL response cache.
+
+    Calls that continue an existing conversation are stateful and always go
+    to the agent.
+    """
+    if conversation_id:
+        return await elastic_agent_client.converse(
+            agent_id=agent_id,
+            message=message,
+            conversation_id=conversation_id,
+        )
+
+    key = _cache_key(agent_id, message)
+    cached = _response_cache.get(key)
+    if cached is not None:
+        logger.info(f"Agent cache hit for '{agent_id}'")
+        return {**cached}
+
+    result = await elastic_agent_client.converse(agent_id=agent_id, message=message)
+    _response_cache[key] = result
+    return {**result}
+
+
+async def cached_converse_batch(agent_id: str, messages: list[str]) -> list:
+    """Batch counterpart of cached_converse: hits are served from the cache,
+    misses go out together through elastic_agent_client.converse_batch.
+
+    Results are returned in message order; a failed call leaves its exception
+    in place of the result dict.
+    """
+    keys = [_cache_key(agent_id, message) for message in messages]
+    results: list = [_response_cache.get(key) for key in keys]
+
+    misses = [i for i, cached in enumerate(results) if cached is None]
+    if len(misses) < len(messages):
+        logger.info(f"Agent cache hit for '{agent_id}' ({len(messages) - len(misses)}/{len(messages)})")
+
+    if misses:
+        fetched = await elastic_agent_client.converse_batch(
+            agent_id=agent_id,
+            messages=[messages[i] for i in misses],
+        )
+        for i, result in zip(misses, fetched):
+            if not isinstance(result, Exception):
+                _response_cache[keys[i]] = result
+            results[i] = result
+
+    return [r if isinstance(r, Exception) else {**r} for r in results]
@@ -161,12 +161,13 @@ async def run_investigation(
         "extracted_drug": "",
         "extracted_reaction": "",
         "direct_response": "",
+        "scanner_raw_response": "",
         "signals": [],
         "investigations": [],
         "reports": [],
         "scanner_conversation_id": "",
-        "investigator_conversation_id": "",
-        "reporter_conversation_id": "",
+        "investigator_conversation_ids": [],
+        "reporter_conversation_ids": [],
         "current_agent": "master_orchestrator",
         "progress_messages": [f"Investigation {investigation_id} started"],
         "errors": [],
@@ -202,7 +203,9 @@ async def stream_investigation(
 ):
     """Stream investigation progress for real-time UI updates.
     
-    Yields state updates as each node completes.
+    Yields (mode, chunk) pairs: ("updates", {node_name: state_update}) as each
+    node completes, and ("custom", {"node": ..., "steps": [...]}) for reasoning
+    steps a long-running node pushes before it finishes.
     """
     if investigation_id is None:
         investigation_id = f"INV-{uuid.uuid4().hex[:8].upper()}"
@@ -217,12 +220,13 @@ async def stream_investigation(
         "extracted_drug": "",
         "extracted_reaction": "",
         "direct_response": "",
+        "scanner_raw_response": "",
         "signals": [],
         "investigations": [],
         "reports": [],
         "scanner_conversation_id": "",
-        "investigator_conversation_id": "",
-        "reporter_conversation_id": "",
+        "investigator_conversation_ids": [],
+        "reporter_conversation_ids": [],
         "current_agent": "master_orchestrator",
         "progress_messages": [f"Investigation {investigation_id} started"],
         "errors": [],
@@ -235,5 +239,7 @@ async def stream_investigation(
     runnable = await create_runnable()
     config = {"configurable": {"thread_id": investigation_id}}
 
-    async for event in runnable.astream(initial_state, config=config):
-        yield event
+    async for mode, chunk in runnable.astream(
+        initial_state, config=config, stream_mode=["updates", "custom"]
+    ):
+        yield mode, chunk
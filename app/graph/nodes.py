@@ -8,43 +8,58 @@ Routing strategy:
 """
 
 import asyncio
+import hashlib
+import itertools
 import logging
-import json
 import re
-from datetime import datetime, timezone
+import time
+from functools import lru_cache
+from typing import Optional
 
+import orjson
+from cachetools import TTLCache
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.config import get_stream_writer
 
 from app.elastic_client import elastic_agent_client
-from app.graph.state import SignalShieldState
+from app.graph.agent_cache import cached_converse
+from app.graph.state import ReasoningStep, SignalShieldState
 
 logger = logging.getLogger(__name__)
 
 
 # ── Direct LLM helper (no tools, no Agent Builder) ────────────────────────────
 
-def _get_groq_llm():
-    """Return a configured ChatGroq instance (tool-free direct LLM calls)."""
+@lru_cache(maxsize=2)
+def _get_groq_llm(model: Optional[str] = None):
+    """Return the shared ChatGroq instance for `model` (tool-free direct LLM calls).
+
+    Built once per model so every call reuses the same Groq client and its
+    pooled keep-alive connections. Defaults to settings.groq_model.
+    """
     from app.config import settings
     return ChatGroq(
-        model=settings.groq_model,
+        model=model or settings.groq_model,
         api_key=settings.groq_api_key,
         temperature=0.3,
         max_tokens=4096,
     )
 
 
-async def _call_llm_direct(system_prompt: str, user_message: str) -> str:
+async def _call_llm_direct(system_prompt: str, user_message: str, model: Optional[str] = None) -> str:
     """Call Groq LLM directly without any tool involvement.
 
     Use this for: classification, general knowledge, greetings, out-of-scope.
     Do NOT use for queries requiring FAERS database access — route those to
     Elastic Agent Builder instead.
 
+    `model` overrides settings.groq_model (e.g. settings.groq_fast_model for
+    short conversational replies).
+
     Returns the response text string.
     """
-    llm = _get_groq_llm()
+    llm = _get_groq_llm(model)
     messages = [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_message),
@@ -52,6 +67,37 @@ async def _call_llm_direct(system_prompt: str, user_message: str) -> str:
     response = await llm.ainvoke(messages)
     return response.content.strip()
 
+
+# Router classifications for identical (history, query) inputs are reused for a
+# minute, and concurrent duplicates share one in-flight Groq call
+_classification_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+_classification_inflight: dict[str, asyncio.Task] = {}
+
+
+def _classification_done(key: str, task: asyncio.Task) -> None:
+    _classification_inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        _classification_cache[key] = task.result()
+
+
+async def _call_llm_classify(system_prompt: str, user_message: str) -> str:
+    """_call_llm_direct for the master router, with caching and request coalescing."""
+    key = hashlib.blake2b(user_message.encode(), digest_size=16).hexdigest()
+
+    cached = _classification_cache.get(key)
+    if cached is not None:
+        logger.info("Master Node: reusing cached classification")
+        return cached
+
+    task = _classification_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_call_llm_direct(system_prompt, user_message))
+        _classification_inflight[key] = task
+        task.add_done_callback(lambda t: _classification_done(key, t))
+
+    # Shield so one cancelled request doesn't cancel the call others await
+    return await asyncio.shield(task)
+
 # ── Tool metadata lookup ──────────────────────────────────
 
 TOOL_FRIENDLY_MESSAGES = {
@@ -122,8 +168,130 @@ patterns, demographics, and co-prescribing risks as appropriate.
 """
 
 
+# ── Agent message templates (filled per signal / investigation) ───────────────
+
+INVESTIGATE_MESSAGE_TEMPLATE = (
+    "Investigate this flagged drug safety signal:\n"
+    "Drug: {drug}\n"
+    "Reaction: {reaction}\n"
+    "PRR: {prr}\n"
+    "Recent cases (90d): {case_count}\n"
+    "Spike ratio: {spike_ratio}x\n\n"
+    "Please perform a full investigation covering demographics, "
+    "concomitant drugs, outcome severity, and geographic distribution."
+)
+
+# Several flagged reactions for the same drug, investigated in one call
+INVESTIGATE_MULTI_MESSAGE_TEMPLATE = (
+    "Investigate these flagged drug safety signals for {drug}:\n"
+    "{signal_lines}\n\n"
+    "Please perform a full investigation covering demographics, "
+    "concomitant drugs, outcome severity, and geographic distribution, "
+    "and address each reaction separately."
+)
+
+INVESTIGATE_SIGNAL_LINE_TEMPLATE = (
+    "- Reaction: {reaction} (PRR: {prr}, Recent cases (90d): {case_count}, "
+    "Spike ratio: {spike_ratio}x)"
+)
+
+REPORT_MESSAGE_TEMPLATE = (
+    "Generate a Drug Safety Signal Assessment Report for:\n\n"
+    "Drug: {drug}\n"
+    "Reaction: {reaction}\n"
+    "PRR: {prr}\n"
+    "Spike ratio: {spike_ratio}x\n"
+    "Priority: {priority}\n\n"
+    "Investigation findings:\n{findings}\n\n"
+    "Please compile the full data using pharma.compile_signal_summary for {drug} "
+    "and generate the complete structured safety report."
+)
+
+# Report for a drug whose flagged reactions were investigated together
+REPORT_MULTI_MESSAGE_TEMPLATE = (
+    "Generate a Drug Safety Signal Assessment Report for:\n\n"
+    "Drug: {drug}\n"
+    "Flagged reactions:\n{signal_lines}\n"
+    "Overall priority: {priority}\n\n"
+    "Investigation findings:\n{findings}\n\n"
+    "Please compile the full data using pharma.compile_signal_summary for {drug} "
+    "and generate the complete structured safety report, assessing each reaction."
+)
+
+REPORT_SIGNAL_LINE_TEMPLATE = (
+    "- Reaction: {reaction} (PRR: {prr}, Recent cases (90d): {case_count}, "
+    "Spike ratio: {spike_ratio}x, Priority: {priority})"
+)
+
+
+# Last whole second seen by _now_iso and its formatted prefix; trace steps
+# arrive in bursts, so strftime runs once per second rather than per step
+_iso_second: list = [0, ""]
+
+
 def _now_iso():
-    return datetime.now(timezone.utc).isoformat()
+    """UTC timestamp in datetime.isoformat() form, e.g.
+    2025-01-01T12:00:00.123456+00:00."""
+    ns = time.time_ns()
+    sec, frac = divmod(ns, 1_000_000_000)
+    if sec != _iso_second[0]:
+        _iso_second[0] = sec
+        _iso_second[1] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+    return f"{_iso_second[1]}.{frac // 1000:06d}+00:00"
+
+
+# Step ids identify a step across its streamed push and the node's final
+# update (content and timestamp alone can repeat)
+_step_ids = itertools.count(1)
+
+
+_HISTORY_PREFIX = {"user": "User"}
+
+
+def _format_history(history: list[dict], turns: int, max_chars: int) -> str:
+    """Render the last `turns` conversation turns as "User: …" / "Assistant: …"
+    lines, each truncated to `max_chars` (a turn without a role counts as user)."""
+    return "\n".join(
+        f"{_HISTORY_PREFIX.get(t.get('role', 'user'), 'Assistant')}: {t.get('content', '')[:max_chars]}"
+        for t in history[-turns:]
+    )
+
+
+def _step(
+    agent: str,
+    step_type: str,
+    content: str,
+    *,
+    tool_name: str = "",
+    tool_input: Optional[dict] = None,
+    tool_query: str = "",
+    tool_result: str = "",
+) -> ReasoningStep:
+    """Build one reasoning-trace step; tool fields are only set for tool steps."""
+    step: ReasoningStep = {
+        "id": next(_step_ids),
+        "agent": agent,
+        "step_type": step_type,
+        "content": content,
+        "timestamp": _now_iso(),
+    }
+    if tool_name:
+        step["tool_name"] = tool_name
+        step["tool_input"] = tool_input or {}
+        step["tool_query"] = tool_query
+        step["tool_result"] = tool_result
+    return step
+
+
+def _emit_steps(node: str, steps: list[dict]) -> None:
+    """Push reasoning steps to stream_mode="custom" listeners as soon as they
+    exist, ahead of the node's final update. The steps are still returned in
+    reasoning_trace; outside a graph run this is a no-op."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"node": node, "steps": list(steps)})
 
 
 def _extract_reasoning_from_response(agent_name: str, result: dict) -> list[dict]:
@@ -140,21 +308,78 @@ def _extract_reasoning_from_response(agent_name: str, result: dict) -> list[dict
         tool_id = tc.get("toolId", tc.get("tool_id", tc.get("name", "unknown_tool")))
 
         # Show a user-friendly message for this tool call
-        friendly_msg = TOOL_FRIENDLY_MESSAGES.get(tool_id, "Running analysis...")
-        steps.append({
-            "agent": agent_name,
-            "step_type": "tool_call",
-            "content": friendly_msg,
-            "tool_name": "",
-            "tool_input": {},
-            "tool_query": "",
-            "tool_result": "",
-            "timestamp": _now_iso(),
-        })
+        steps.append(_step(
+            agent_name,
+            "tool_call",
+            TOOL_FRIENDLY_MESSAGES.get(tool_id, "Running analysis..."),
+        ))
 
     return steps
 
 
+# Candidate lines for the scanner parser: signal headers, metric bullets and
+# "## " section headings (the latter end the flagged-signal list)
+_SIGNAL_LINE_RE = re.compile(
+    r"^(?:[ \t]*## .*|.*(?:→|flagged signal|prr|cases|case count|spike|priority).*)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Only ever matches a well-formed number, so float() on the match can't fail
+_FLOAT_RE = re.compile(r"\d*\.?\d+")
+_INT_RE = re.compile(r"[\d,]+")
+# Signal header tokenizer: skips list/heading/bold markup, the red-dot marker
+# and the FLAGGED SIGNAL prefix, then splits drug and reaction on the first
+# arrow. Any text after a second arrow is dropped.
+_SIGNAL_HEADER_RE = re.compile(
+    r"^(?:[\s*#:\-]|\d+[.)]\s|🔴|FLAGGED\s*SIGNAL:?)*"
+    r"(?P<drug>[^→]*?)[\s*]*→[\s*]*(?P<reaction>[^→]*?)[\s*#:\-]*(?:→.*)?$",
+    re.IGNORECASE,
+)
+_PRIORITY_RE = re.compile(r"\b(CRITICAL|HIGH|MEDIUM|LOW)\b", re.IGNORECASE)
+# Risk wording in a Safety Reporter response that can override signal priority
+_RISK_RE = re.compile(r"\bCRITICAL\b|\b(?:HIGH|LOW) RISK\b", re.IGNORECASE)
+# First flat JSON object in an LLM reply that wrapped it in prose / fences
+_JSON_OBJECT_RE = re.compile(r"\{[^}]+\}")
+# Yes/No answer of the Case Investigator's "Potential interaction:" template
+# field (or an "Interaction detected:" variant), markdown bold allowed around
+# the colon and answer. Free-form prose is not scanned: negated phrasings
+# ("no interaction detected") read just like positive ones.
+_INTERACTION_RE = re.compile(
+    r"(?:potential interaction|interaction detected)\s*\**\s*:\s*\**\s*(yes|no)\b",
+    re.IGNORECASE,
+)
+
+# Case Investigator and Safety Reporter close with a machine-readable line,
+# "ASSESSMENT: {...}" (see agent_config/agents.json)
+_ASSESSMENT_MARKER = "ASSESSMENT:"
+_RISK_LEVELS = {"CRITICAL": "CRITICAL", "HIGH": "HIGH", "MODERATE": "MEDIUM", "MEDIUM": "MEDIUM", "LOW": "LOW"}
+
+# Signal priorities by severity; anything else (e.g. UNKNOWN) ranks lowest
+_PRIORITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+
+def _signal_rank(signal: dict) -> int:
+    return _PRIORITY_RANK.get(str(signal.get("priority", "")).upper(), -1)
+
+
+def _split_assessment(response: str) -> tuple[str, dict]:
+    """Split the trailing ASSESSMENT line off an agent response.
+
+    Returns (prose, fields). fields is empty when the line is missing or
+    malformed, in which case callers fall back to scanning the prose.
+    """
+    head, marker, tail = response.rpartition(_ASSESSMENT_MARKER)
+    tail = tail.strip()
+    if not marker or "\n" in tail or (head and not head.endswith("\n")):
+        return response, {}
+    try:
+        fields = orjson.loads(tail)
+    except orjson.JSONDecodeError:
+        return response, {}
+    if not isinstance(fields, dict):
+        return response, {}
+    return head.rstrip(), fields
+
+
 def _extract_signals_from_response(response_text: str, raw_result: dict = None) -> list[dict]:
     """Parse Signal Scanner agent response into structured signal records.
 
@@ -170,65 +395,75 @@ def _extract_signals_from_response(response_text: str, raw_result: dict = None)
     signals = []
     current_signal = None
 
-    for line in response_text.split("\n"):
-        line = line.strip()
-
-        # Match signal header: "FLAGGED SIGNAL: Cardizol-X → Cardiac Arrest"
-        if "FLAGGED SIGNAL" in line.upper() or ("→" in line and ("signal" in line.lower() or "🔴" in line or "flag" in line.lower())):
+    # One pass over the full text: only lines that can carry a signal header,
+    # a metric, or a section break are visited — prose lines never reach the
+    # per-line checks below
+    for match in _SIGNAL_LINE_RE.finditer(response_text):
+        line = match.group().strip()
+        ll = line.lower()
+
+        # A new "## " section after the flagged list ends the scan — the rest
+        # of the response is narrative and can only pollute the last signal
+        if current_signal and line.startswith("## ") and "signal" not in ll:
+            break
+
+        # Match signal header: "FLAGGED SIGNAL: Cardizol-X → Cardiac Arrest".
+        # A header without an arrow carries no drug/reaction pair, so the
+        # cheap single-char test goes first ("flagged signal" implies "signal").
+        if "→" in line and ("signal" in ll or "🔴" in line or "flag" in ll):
             if current_signal and current_signal.get("drug_name"):
                 signals.append(current_signal)
+            current_signal = None
 
-            parts = line.split("→")
-            if len(parts) >= 2:
-                drug = parts[0].replace("**", "").replace("🔴", "").replace("FLAGGED SIGNAL:", "").replace("FLAGGED SIGNAL", "").strip()
-                drug = re.sub(r'^[*#\-:\s]+', '', drug).strip()
-                reaction = parts[1].replace("**", "").strip().split("\n")[0].strip()
-                # Clean trailing punctuation
-                reaction = re.sub(r'[*#\-:]+$', '', reaction).strip()
-                if drug:
-                    current_signal = {
-                        "drug_name": drug,
-                        "reaction_term": reaction,
-                        "prr": 0.0,
-                        "case_count": 0,
-                        "spike_ratio": 0.0,
-                        "priority": "HIGH",
-                        "raw_response": "",
-                    }
+            header = _SIGNAL_HEADER_RE.match(line)
+            drug = header["drug"].replace("**", "")
+            reaction = header["reaction"].replace("**", "")
+            if drug:
+                current_signal = {
+                    "drug_name": drug,
+                    "reaction_term": reaction,
+                    "prr": 0.0,
+                    "case_count": 0,
+                    "spike_ratio": 0.0,
+                    "priority": "HIGH",
+                    "raw_response": "",
+                }
+
+        if not current_signal:
+            continue
+
+        # Metric bullets are "label: value" and name exactly one field, so
+        # dispatch on the label alone — a value that mentions another field
+        # ("Priority: HIGH, cases rising") can't be misread
+        label = ll.partition(":")[0]
+        value = line.rpartition(":")[2]
 
         # Parse PRR
-        if current_signal and "prr" in line.lower():
-            match = re.search(r"[\d.]+", line.split(":")[-1])
+        if "prr" in label:
+            match = _FLOAT_RE.search(value)
             if match:
-                try:
-                    current_signal["prr"] = float(match.group())
-                except ValueError:
-                    pass
+                current_signal["prr"] = float(match.group())
             # Handle "∞" PRR
-            if "∞" in line or "infinite" in line.lower() or "exclusive" in line.lower():
+            if "∞" in line or "infinite" in ll or "exclusive" in ll:
                 current_signal["prr"] = 999.0
 
         # Parse case count
-        if current_signal and ("recent cases" in line.lower() or "case count" in line.lower() or "cases" in line.lower()):
-            match = re.search(r"([\d,]+)", line.split(":")[-1])
+        elif "cases" in label or "case count" in label:
+            match = _INT_RE.search(value)
             if match:
-                current_signal["case_count"] = int(match.group(1).replace(",", ""))
+                current_signal["case_count"] = int(match.group().replace(",", ""))
 
         # Parse spike ratio
-        if current_signal and "spike" in line.lower():
-            match = re.search(r"[\d.]+", line.split(":")[-1])
+        elif "spike" in label:
+            match = _FLOAT_RE.search(value)
             if match:
-                try:
-                    current_signal["spike_ratio"] = float(match.group())
-                except ValueError:
-                    pass
+                current_signal["spike_ratio"] = float(match.group())
 
         # Parse priority
-        if current_signal and "priority" in line.lower():
-            for level in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]:
-                if level in line.upper():
-                    current_signal["priority"] = level
-                    break
+        elif "priority" in label:
+            level = _PRIORITY_RE.search(line)
+            if level:
+                current_signal["priority"] = level.group(1).upper()
 
     # Append last signal
     if current_signal and current_signal.get("drug_name"):
@@ -254,11 +489,13 @@ def _extract_signals_from_response(response_text: str, raw_result: dict = None)
                 drug = params.get("drug_name", "")
                 for res in results_list:
                     if res.get("type") == "esql_results":
-                        vals = res.get("data", {}).get("values", [])
-                        cols = [c["name"] for c in res.get("data", {}).get("columns", [])]
-                        for row in vals:
-                            row_dict = dict(zip(cols, row))
-                            spike = row_dict.get("spike_ratio")
+                        data = res.get("data", {})
+                        cols = [c["name"] for c in data.get("columns", [])]
+                        if "spike_ratio" not in cols:
+                            continue
+                        spike_idx = cols.index("spike_ratio")
+                        for row in data.get("values", []):
+                            spike = row[spike_idx] if spike_idx < len(row) else None
                             if spike and spike > 2.0:
                                 spike_drugs[drug] = float(spike)
 
@@ -268,12 +505,17 @@ def _extract_signals_from_response(response_text: str, raw_result: dict = None)
                 reaction = params.get("reaction_term", "")
                 for res in results_list:
                     if res.get("type") == "esql_results":
-                        vals = res.get("data", {}).get("values", [])
-                        cols = [c["name"] for c in res.get("data", {}).get("columns", [])]
-                        for row in vals:
-                            row_dict = dict(zip(cols, row))
-                            prr = row_dict.get("prr")
-                            drug_total = row_dict.get("drug_total", 0)
+                        data = res.get("data", {})
+                        cols = [c["name"] for c in data.get("columns", [])]
+                        if "prr" not in cols or "drug_total" not in cols:
+                            continue
+                        prr_idx = cols.index("prr")
+                        total_idx = cols.index("drug_total")
+                        for row in data.get("values", []):
+                            if len(row) <= max(prr_idx, total_idx):
+                                continue
+                            prr = row[prr_idx]
+                            drug_total = row[total_idx] or 0
                             if prr and prr > 2.0 and drug_total > 0:
                                 prr_signals[(drug, reaction)] = float(prr)
 
@@ -307,6 +549,126 @@ def _extract_signals_from_response(response_text: str, raw_result: dict = None)
 
 # ── Master Node (Intelligent Router) ──────────────────────
 
+# Router prompt (constant — adjacent literals fold into one string at compile time)
+CLASSIFICATION_SYSTEM_PROMPT = (
+    "You are a query classifier for SignalShield AI, a pharmacovigilance system. "
+    "Classify the user query into exactly one route and extract any drug/reaction entities. "
+    "Respond with ONLY a valid JSON object — no markdown fences, no explanation.\n\n"
+    "Our database has these key drugs with known safety signals:\n"
+    "  - Cardizol-X (cardiac arrhythmia spike in last 90 days)\n"
+    "  - Neurofen-Plus (hepatotoxicity in elderly females, rising trend)\n"
+    "  - Arthrex-200 (rhabdomyolysis when co-prescribed with statins)\n"
+    "Other drugs: Lipitorex, Metforin-XR, Amlodex, Omeprazol-20, Sertralex, "
+    "Levothyra, Gabapentex, Lisinox, Simvalex, Warfatrex, Prednizol, Tramadex, "
+    "Clopidex, Azithrex, Fluoxetex, Ramiprilex, Diclofex\n\n"
+    "Routes:\n"
+    "  greeting    — Casual greetings or conversational openers "
+                    "(e.g. 'hi', 'hello', 'how are you?', 'what can you do?', 'who are you?')\n"
+    "  full_scan   — Broad scan across ALL drugs for safety signals "
+                    "(e.g. 'scan for signals', 'any emerging safety issues')\n"
+    "  investigate — Deep-dive into ONE SPECIFIC drug using FAERS adverse event data "
+                    "(e.g. 'Investigate Cardizol-X', 'Is Neurofen-Plus safe?')\n"
+    "  report      — Generate a formal safety report for a specific drug "
+                    "(e.g. 'Generate safety report for Arthrex-200')\n"
+    "  data_query  — Quick factual FAERS database question "
+                    "(e.g. 'How many events?', 'Top 5 drugs by fatality')\n"
+    "  general     — Conceptual / knowledge question that does NOT need FAERS data: "
+                    "drug labels, warnings, contraindications, dosage, mechanism, "
+                    "pharmacovigilance methods, PRR, EBGM, ICH guidelines, etc.\n"
+    "  out_of_scope — Completely unrelated to drugs or pharmacovigilance "
+                    "(e.g. 'weather', 'jokes', 'sports', 'coding help')\n\n"
+    "Rules:\n"
+    "  - Greetings, small talk, 'how are you', 'what can you do' → greeting\n"
+    "  - Drug label/warnings/contraindications/dosage questions → general "
+        "(even if a drug name is mentioned)\n"
+    "  - Questions needing actual FAERS counts/demographics → investigate or data_query\n"
+    "  - Respond with exactly: "
+        '{"route": "<route>", "drug_name": "<drug or empty>", "reaction_term": "<reaction or empty>"}'
+)
+
+# Routes whose next node calls an Agent Builder agent
+_AGENT_ROUTES = {"full_scan", "investigate", "report", "data_query"}
+
+# Kibana warm-ups left running past routing; referenced until done so the
+# event loop does not drop them
+_warmup_tasks: set = set()
+
+# Whole-query greetings / small talk that can be routed without the LLM.
+# Anything with more content ("hi, any new signals?") still goes to the classifier.
+_GREETING_RE = re.compile(
+    r"\s*(?:hi|hello|hey|hiya|good (?:morning|afternoon|evening)|how are you(?: doing)?"
+    r"|what can you do|who are you|thanks|thank you|bye|goodbye)"
+    r"(?:\s+there)?[\s!?.,]*",
+    re.IGNORECASE,
+)
+
+# Keyword fallback classifier — used only when the router LLM doesn't return
+# parseable JSON. Each keyword list is one compiled alternation so a query is
+# scanned once per list instead of once per keyword.
+
+# Known drug names in our database (lower-case spelling → canonical name)
+_KNOWN_DRUGS = {
+    "cardizol-x": "Cardizol-X", "cardizol": "Cardizol-X",
+    "neurofen-plus": "Neurofen-Plus", "neurofen": "Neurofen-Plus",
+    "arthrex-200": "Arthrex-200", "arthrex": "Arthrex-200",
+    "lipitorex": "Lipitorex", "metforin-xr": "Metforin-XR",
+    "metforin": "Metforin-XR", "amlodex": "Amlodex",
+    "omeprazol-20": "Omeprazol-20", "omeprazol": "Omeprazol-20",
+    "sertralex": "Sertralex", "levothyra": "Levothyra",
+    "gabapentex": "Gabapentex", "lisinox": "Lisinox",
+    "simvalex": "Simvalex", "warfatrex": "Warfatrex",
+    "prednizol": "Prednizol", "tramadex": "Tramadex",
+    "clopidex": "Clopidex", "azithrex": "Azithrex",
+    "fluoxetex": "Fluoxetex", "ramiprilex": "Ramiprilex",
+    "diclofex": "Diclofex",
+}
+
+# General knowledge patterns (no DB needed)
+_GENERAL_PATTERNS = [
+    "what is", "what are", "explain", "define", "how does", "how do",
+    "tell me about prr", "tell me about ror", "tell me about faers",
+    "what does", "meaning of", "difference between",
+]
+
+# Pharma-related keywords to detect domain relevance
+_PHARMA_KEYWORDS = [
+    "drug", "adverse", "event", "safety", "signal", "pharmacovigilance",
+    "prr", "ror", "faers", "fda", "reaction", "side effect", "clinical",
+    "patient", "dose", "dosage", "prescription", "medication", "hepato",
+    "cardiac", "rhabdomyolysis", "report", "scan", "investigate", "label",
+    "contraindication", "warning", "interaction", "toxicity", "mortality",
+    "meddra", "icsr", "psur", "ich", "rems", "ebgm", "bcpnn",
+    "statin", "opioid", "nsaid", "arrhythmia", "hepatitis",
+    "serious", "fatal", "hospitalization", "surveillance",
+]
+
+# Drug-label questions (answered from the knowledge base, not FAERS)
+_LABEL_KEYWORDS = [
+    "contraindication", "warning", "precaution", "interaction",
+    "dosage", "dose", "maximum dose", "mechanism", "half-life",
+    "prescribing", "label", "indication", "black box",
+    "elderly", "pregnancy", "pediatric", "renal", "hepatic impairment",
+    "adverse reaction", "side effect", "clinical pharmacology",
+]
+
+_DATA_QUESTION_KEYWORDS = ["how many", "top ", "count", "fatality rate", "geographic", "demographics"]
+_REPORT_REQUEST_KEYWORDS = ["generate", "write", "create", "compile", "report"]
+
+
+def _keyword_re(keywords) -> re.Pattern:
+    """Substring alternation over keywords, longest first so the most specific
+    spelling wins (e.g. "cardizol-x" over "cardizol")."""
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+_KNOWN_DRUG_RE = _keyword_re(_KNOWN_DRUGS)
+_GENERAL_QUERY_RE = _keyword_re(_GENERAL_PATTERNS)
+_PHARMA_KEYWORD_RE = _keyword_re(_PHARMA_KEYWORDS)
+_LABEL_QUESTION_RE = _keyword_re(_LABEL_KEYWORDS)
+_DATA_QUESTION_RE = _keyword_re(_DATA_QUESTION_KEYWORDS)
+_REPORT_REQUEST_RE = _keyword_re(_REPORT_REQUEST_KEYWORDS)
+
+
 async def master_node(state: SignalShieldState) -> dict:
     """Master Node: Classifies user intent and routes to the right agent pipeline.
     
@@ -314,91 +676,62 @@ async def master_node(state: SignalShieldState) -> dict:
     This ensures ALL intelligence flows through Elastic Agent Builder.
     """
     query = state.get("query", "")
-    logger.info(f"Master Node: Classifying query — '{query[:80]}...'")
+    logger.info("Master Node: Classifying query — '%s...'", query[:80])
 
-    reasoning = [{
-        "agent": "master_orchestrator",
-        "step_type": "thinking",
-        "content": "Understanding your question...",
-        "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-        "timestamp": _now_iso(),
-    }]
+    reasoning = [_step("master_orchestrator", "thinking", "Understanding your question...")]
 
-    try:
-        # ── Classification via direct Groq call (no tools needed, faster) ──
-        # The LLM decides EVERYTHING: greetings, out-of-scope, general, tools, etc.
-        classification_system = (
-            "You are a query classifier for SignalShield AI, a pharmacovigilance system. "
-            "Classify the user query into exactly one route and extract any drug/reaction entities. "
-            "Respond with ONLY a valid JSON object — no markdown fences, no explanation.\n\n"
-            "Our database has these key drugs with known safety signals:\n"
-            "  - Cardizol-X (cardiac arrhythmia spike in last 90 days)\n"
-            "  - Neurofen-Plus (hepatotoxicity in elderly females, rising trend)\n"
-            "  - Arthrex-200 (rhabdomyolysis when co-prescribed with statins)\n"
-            "Other drugs: Lipitorex, Metforin-XR, Amlodex, Omeprazol-20, Sertralex, "
-            "Levothyra, Gabapentex, Lisinox, Simvalex, Warfatrex, Prednizol, Tramadex, "
-            "Clopidex, Azithrex, Fluoxetex, Ramiprilex, Diclofex\n\n"
-            "Routes:\n"
-            "  greeting    — Casual greetings or conversational openers "
-                            "(e.g. 'hi', 'hello', 'how are you?', 'what can you do?', 'who are you?')\n"
-            "  full_scan   — Broad scan across ALL drugs for safety signals "
-                            "(e.g. 'scan for signals', 'any emerging safety issues')\n"
-            "  investigate — Deep-dive into ONE SPECIFIC drug using FAERS adverse event data "
-                            "(e.g. 'Investigate Cardizol-X', 'Is Neurofen-Plus safe?')\n"
-            "  report      — Generate a formal safety report for a specific drug "
-                            "(e.g. 'Generate safety report for Arthrex-200')\n"
-            "  data_query  — Quick factual FAERS database question "
-                            "(e.g. 'How many events?', 'Top 5 drugs by fatality')\n"
-            "  general     — Conceptual / knowledge question that does NOT need FAERS data: "
-                            "drug labels, warnings, contraindications, dosage, mechanism, "
-                            "pharmacovigilance methods, PRR, EBGM, ICH guidelines, etc.\n"
-            "  out_of_scope — Completely unrelated to drugs or pharmacovigilance "
-                            "(e.g. 'weather', 'jokes', 'sports', 'coding help')\n\n"
-            "Rules:\n"
-            "  - Greetings, small talk, 'how are you', 'what can you do' → greeting\n"
-            "  - Drug label/warnings/contraindications/dosage questions → general "
-                "(even if a drug name is mentioned)\n"
-            "  - Questions needing actual FAERS counts/demographics → investigate or data_query\n"
-            "  - Respond with exactly: "
-                '{"route": "<route>", "drug_name": "<drug or empty>", "reaction_term": "<reaction or empty>"}'
-        )
+    # ── Fast path: a bare greeting never needs the classifier round-trip ──
+    if _GREETING_RE.fullmatch(query):
+        logger.info("Master Node: route=greeting (matched without classifier)")
+        return {
+            "route": "greeting",
+            "extracted_drug": "",
+            "extracted_reaction": "",
+            "status": "routing",
+            "current_agent": "master_orchestrator",
+            "reasoning_trace": [],
+            "progress_messages": ["🧠 Master Orchestrator: Routed to 'greeting'"],
+        }
+
+    # Most routes end at an Agent Builder agent — open the Kibana connection
+    # while the classifier runs instead of after it. Routing never waits on
+    # it: agent routes leave it running alongside the first Converse call.
+    warmup = asyncio.create_task(elastic_agent_client.warm_up())
+    _warmup_tasks.add(warmup)
+    warmup.add_done_callback(_warmup_tasks.discard)
 
+    try:
         # ── Build conversation history context for follow-ups ──
         history = state.get("conversation_history", [])
         history_context = ""
         if history:
-            # Keep last 6 turns to avoid token bloat
-            recent = history[-6:]
-            history_lines = []
-            for turn in recent:
-                role = turn.get("role", "user")
-                content = turn.get("content", "")[:300]  # truncate long responses
-                prefix = "User" if role == "user" else "Assistant"
-                history_lines.append(f"{prefix}: {content}")
+            # Keep last 6 turns (300 chars each) to avoid token bloat
             history_context = (
                 "\n\nConversation history (most recent messages):\n"
-                + "\n".join(history_lines)
+                + _format_history(history, 6, 300)
                 + "\n\nUse the conversation history to understand follow-up references "
                 "(e.g. 'that drug', 'tell me more', 'investigate it', etc.).\n"
             )
 
         classification_user = f'{history_context}User query: "{query}"'
 
-        response_text = await _call_llm_direct(classification_system, classification_user)
-        logger.info(f"Master Orchestrator (Groq direct) raw response: {response_text[:500]}")
+        # ── Classification via direct Groq call (no tools needed, faster) ──
+        # The LLM decides EVERYTHING: greetings, out-of-scope, general, tools, etc.
+        response_text = await _call_llm_classify(CLASSIFICATION_SYSTEM_PROMPT, classification_user)
+        logger.info("Master Orchestrator (Groq direct) raw response: %s", response_text[:500])
 
         # Parse JSON classification from the agent
         # Try to extract JSON even if the agent wraps it in markdown or extra text
         classification = None
         try:
-            classification = json.loads(response_text)
-        except json.JSONDecodeError:
+            classification = orjson.loads(response_text)
+        except orjson.JSONDecodeError:
             # Try to find JSON object in the response
-            json_match = re.search(r'\{[^}]+\}', response_text)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 try:
-                    classification = json.loads(json_match.group())
-                except json.JSONDecodeError:
+                    classification = orjson.loads(json_match.group())
+                except orjson.JSONDecodeError:
                     pass
 
         if not classification:
@@ -408,77 +741,24 @@ async def master_node(state: SignalShieldState) -> dict:
             logger.warning("Master Node: JSON parse failed — using keyword fallback classifier")
             q_lower = query.lower().strip()
 
-            # Known drug names in our database
-            known_drugs = [
-                "cardizol-x", "neurofen-plus", "arthrex-200",
-                "cardizol", "neurofen", "arthrex",
-                "lipitorex", "metforin-xr", "metforin", "amlodex",
-                "omeprazol-20", "omeprazol", "sertralex", "levothyra",
-                "gabapentex", "lisinox", "simvalex", "warfatrex",
-                "prednizol", "tramadex", "clopidex", "azithrex",
-                "fluoxetex", "ramiprilex", "diclofex",
-            ]
-            found_drug = ""
-            for d in known_drugs:
-                if d in q_lower:
-                    # Capitalise properly
-                    drug_map = {
-                        "cardizol-x": "Cardizol-X", "cardizol": "Cardizol-X",
-                        "neurofen-plus": "Neurofen-Plus", "neurofen": "Neurofen-Plus",
-                        "arthrex-200": "Arthrex-200", "arthrex": "Arthrex-200",
-                        "lipitorex": "Lipitorex", "metforin-xr": "Metforin-XR",
-                        "metforin": "Metforin-XR", "amlodex": "Amlodex",
-                        "omeprazol-20": "Omeprazol-20", "omeprazol": "Omeprazol-20",
-                        "sertralex": "Sertralex", "levothyra": "Levothyra",
-                        "gabapentex": "Gabapentex", "lisinox": "Lisinox",
-                        "simvalex": "Simvalex", "warfatrex": "Warfatrex",
-                        "prednizol": "Prednizol", "tramadex": "Tramadex",
-                        "clopidex": "Clopidex", "azithrex": "Azithrex",
-                        "fluoxetex": "Fluoxetex", "ramiprilex": "Ramiprilex",
-                        "diclofex": "Diclofex",
-                    }
-                    found_drug = drug_map.get(d, d)
-                    break
-
-            # General knowledge patterns (no DB needed)
-            general_patterns = [
-                "what is", "what are", "explain", "define", "how does", "how do",
-                "tell me about prr", "tell me about ror", "tell me about faers",
-                "what does", "meaning of", "difference between",
-            ]
-            is_general = any(q_lower.startswith(p) or p in q_lower for p in general_patterns)
-
-            # Pharma-related keywords to detect domain relevance
-            pharma_keywords = [
-                "drug", "adverse", "event", "safety", "signal", "pharmacovigilance",
-                "prr", "ror", "faers", "fda", "reaction", "side effect", "clinical",
-                "patient", "dose", "dosage", "prescription", "medication", "hepato",
-                "cardiac", "rhabdomyolysis", "report", "scan", "investigate", "label",
-                "contraindication", "warning", "interaction", "toxicity", "mortality",
-                "meddra", "icsr", "psur", "ich", "rems", "ebgm", "bcpnn",
-                "statin", "opioid", "nsaid", "arrhythmia", "hepatitis",
-                "serious", "fatal", "hospitalization", "surveillance",
-            ]
-            has_pharma_context = any(kw in q_lower for kw in pharma_keywords)
+            m = _KNOWN_DRUG_RE.search(q_lower)
+            found_drug = _KNOWN_DRUGS[m.group()] if m else ""
+
+            is_general = bool(_GENERAL_QUERY_RE.search(q_lower))
+            has_pharma_context = bool(_PHARMA_KEYWORD_RE.search(q_lower))
 
             # But only if NO drug is mentioned and it's a conceptual question
             if is_general and not found_drug:
                 classification = {"route": "general", "drug_name": "", "reaction_term": ""}
             # Drug-label knowledge question (drug name + label-related keywords → RAG)
-            elif found_drug and any(kw in q_lower for kw in [
-                "contraindication", "warning", "precaution", "interaction",
-                "dosage", "dose", "maximum dose", "mechanism", "half-life",
-                "prescribing", "label", "indication", "black box",
-                "elderly", "pregnancy", "pediatric", "renal", "hepatic impairment",
-                "adverse reaction", "side effect", "clinical pharmacology",
-            ]):
+            elif found_drug and _LABEL_QUESTION_RE.search(q_lower):
                 classification = {"route": "general", "drug_name": found_drug, "reaction_term": ""}
-                logger.info(f"Master Node: Drug-label knowledge question detected → routing to RAG")
+                logger.info("Master Node: Drug-label knowledge question detected → routing to RAG")
             # Quick data questions
-            elif any(kw in q_lower for kw in ["how many", "top ", "count", "fatality rate", "geographic", "demographics"]):
+            elif _DATA_QUESTION_RE.search(q_lower):
                 classification = {"route": "data_query", "drug_name": found_drug, "reaction_term": ""}
             # Report generation
-            elif any(kw in q_lower for kw in ["generate", "write", "create", "compile", "report"]):
+            elif _REPORT_REQUEST_RE.search(q_lower):
                 classification = {"route": "report", "drug_name": found_drug, "reaction_term": ""}
             # Drug-specific investigation
             elif found_drug:
@@ -486,7 +766,7 @@ async def master_node(state: SignalShieldState) -> dict:
             # Out-of-scope: no drug found AND no pharma keywords detected
             elif not has_pharma_context and not found_drug:
                 classification = {"route": "out_of_scope", "drug_name": "", "reaction_term": ""}
-                logger.info(f"Master Node: Query appears out of scope — '{query[:60]}'")
+                logger.info("Master Node: Query appears out of scope — '%s'", query[:60])
             # Default to full scan
             else:
                 classification = {"route": "full_scan", "drug_name": "", "reaction_term": ""}
@@ -495,9 +775,9 @@ async def master_node(state: SignalShieldState) -> dict:
             if classification["route"] == "general":
                 # The agent already returned a useful answer in response_text
                 # We'll store it so general_knowledge_node can use it or we short-circuit
-                logger.info(f"Master Node: Agent already answered (fallback general). Capturing response.")
+                logger.info("Master Node: Agent already answered (fallback general). Capturing response.")
             
-            logger.info(f"Master Node: Fallback classification → {classification}")
+            logger.info("Master Node: Fallback classification → %s", classification)
 
         route = classification.get("route", "full_scan")
         drug = classification.get("drug_name", "")
@@ -506,15 +786,18 @@ async def master_node(state: SignalShieldState) -> dict:
         # Validate route
         valid_routes = {"full_scan", "investigate", "report", "data_query", "general", "out_of_scope", "greeting"}
         if route not in valid_routes:
-            logger.warning(f"Master Node: Invalid route '{route}', defaulting to full_scan")
+            logger.warning("Master Node: Invalid route '%s', defaulting to full_scan", route)
             route = "full_scan"
 
         # If investigate/report/data_query requires a drug but none extracted, fall back to full_scan
         if route in ("investigate", "report") and not drug:
-            logger.info(f"Master Node: Route '{route}' requires a drug name but none found, falling back to full_scan")
+            logger.info("Master Node: Route '%s' requires a drug name but none found, falling back to full_scan", route)
             route = "full_scan"
 
-        logger.info(f"Master Node: route={route}, drug={drug}, reaction={reaction}")
+        logger.info("Master Node: route=%s, drug=%s, reaction=%s", route, drug, reaction)
+
+        if route not in _AGENT_ROUTES:
+            warmup.cancel()
 
         # For greeting / out_of_scope: suppress reasoning trace.
         # These routes involve no tools or meaningful agent work,
@@ -531,13 +814,7 @@ async def master_node(state: SignalShieldState) -> dict:
                 "general": "Searching our knowledge base for the best answer...",
             }
             conclusion_msg = friendly_conclusions.get(route, "Working on your request...")
-            reasoning.append({
-                "agent": "master_orchestrator",
-                "step_type": "conclusion",
-                "content": conclusion_msg,
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
+            reasoning.append(_step("master_orchestrator", "conclusion", conclusion_msg))
 
         result_dict = {
             "route": route,
@@ -555,14 +832,12 @@ async def master_node(state: SignalShieldState) -> dict:
         return result_dict
 
     except Exception as e:
-        logger.error(f"Master Node failed: {e}")
-        reasoning.append({
-            "agent": "master_orchestrator",
-            "step_type": "conclusion",
-            "content": "Running a full safety scan to cover all angles...",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
+        logger.error("Master Node failed: %s", e)
+        reasoning.append(_step(
+            "master_orchestrator",
+            "conclusion",
+            "Running a full safety scan to cover all angles...",
+        ))
         return {
             "route": "full_scan",
             "extracted_drug": "",
@@ -584,23 +859,19 @@ async def direct_query_node(state: SignalShieldState) -> dict:
     drug = state.get("extracted_drug", "")
     reaction = state.get("extracted_reaction", "")
 
-    logger.info(f"Direct Query Node: Answering data question — '{query[:80]}'")
+    logger.info("Direct Query Node: Answering data question — '%s'", query[:80])
 
     # Build conversation context for follow-ups
     history = state.get("conversation_history", [])
     history_context = ""
     if history:
-        recent = history[-4:]
-        history_lines = [f"{'User' if t.get('role')=='user' else 'Assistant'}: {t.get('content','')[:200]}" for t in recent]
-        history_context = "\n\nRecent conversation for context:\n" + "\n".join(history_lines) + "\n"
-
-    reasoning = [{
-        "agent": "data_query",
-        "step_type": "thinking",
-        "content": f"{'Looking up data for ' + drug + '...' if drug else 'Searching the database for your answer...'}",
-        "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-        "timestamp": _now_iso(),
-    }]
+        history_context = "\n\nRecent conversation for context:\n" + _format_history(history, 4, 200) + "\n"
+
+    reasoning = [_step(
+        "data_query",
+        "thinking",
+        f"{'Looking up data for ' + drug + '...' if drug else 'Searching the database for your answer...'}",
+    )]
 
     # Choose the right agent based on whether a drug is specified
     if drug:
@@ -638,13 +909,7 @@ async def direct_query_node(state: SignalShieldState) -> dict:
         agent_reasoning = _extract_reasoning_from_response(agent_id, result)
         reasoning.extend(agent_reasoning)
 
-        reasoning.append({
-            "agent": agent_id,
-            "step_type": "conclusion",
-            "content": "Found the data — here's your answer.",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
+        reasoning.append(_step(agent_id, "conclusion", "Found the data — here's your answer."))
 
         return {
             "status": "complete",
@@ -655,14 +920,12 @@ async def direct_query_node(state: SignalShieldState) -> dict:
         }
 
     except Exception as e:
-        logger.error(f"Direct Query Node failed: {e}")
-        reasoning.append({
-            "agent": agent_id,
-            "step_type": "conclusion",
-            "content": "Couldn't retrieve the data right now. Please try again.",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
+        logger.error("Direct Query Node failed: %s", e)
+        reasoning.append(_step(
+            agent_id,
+            "conclusion",
+            "Couldn't retrieve the data right now. Please try again.",
+        ))
         return {
             "status": "error",
             "direct_response": f"Sorry, I couldn't retrieve that data: {str(e)}",
@@ -672,6 +935,19 @@ async def direct_query_node(state: SignalShieldState) -> dict:
         }
 
 
+_OOS_SYSTEM_PROMPT = (
+    "You are SignalShield AI — a specialist drug safety and pharmacovigilance assistant. "
+    "The user has asked a question that is outside your domain. "
+    "Respond in 2-3 short sentences MAX. Be warm, polite, and professional. "
+    "Briefly acknowledge their question, then explain you specialize in drug safety. "
+    "Suggest ONE relevant example query they could try — for example: "
+    "'Investigate Cardizol-X for cardiac safety signals', "
+    "'Is Neurofen-Plus safe for elderly patients?', or "
+    "'Check Arthrex-200 interactions with statins'. "
+    "Do NOT use headers, bullet lists, or emoji. Keep it conversational and concise."
+)
+
+
 async def out_of_scope_node(state: SignalShieldState) -> dict:
     """Handles queries outside the pharmacovigilance domain.
 
@@ -680,33 +956,24 @@ async def out_of_scope_node(state: SignalShieldState) -> dict:
     drug-safety topics SignalShield can actually help with.
     """
     query = state.get("query", "")
-    logger.info(f"Out of Scope Node: Politely redirecting — '{query[:80]}'")
+    logger.info("Out of Scope Node: Politely redirecting — '%s'", query[:80])
 
     # Build conversation context for follow-ups
     history = state.get("conversation_history", [])
     history_context = ""
     if history:
-        recent = history[-4:]
-        history_lines = [f"{'User' if t.get('role')=='user' else 'Assistant'}: {t.get('content','')[:200]}" for t in recent]
-        history_context = "\nRecent conversation:\n" + "\n".join(history_lines) + "\n"
+        history_context = "\nRecent conversation:\n" + _format_history(history, 4, 200) + "\n"
+
+    from app.config import settings
 
     try:
         redirect_response = await _call_llm_direct(
-            system_prompt=(
-                "You are SignalShield AI — a specialist drug safety and pharmacovigilance assistant. "
-                "The user has asked a question that is outside your domain. "
-                "Respond in 2-3 short sentences MAX. Be warm, polite, and professional. "
-                "Briefly acknowledge their question, then explain you specialize in drug safety. "
-                "Suggest ONE relevant example query they could try — for example: "
-                "'Investigate Cardizol-X for cardiac safety signals', "
-                "'Is Neurofen-Plus safe for elderly patients?', or "
-                "'Check Arthrex-200 interactions with statins'. "
-                "Do NOT use headers, bullet lists, or emoji. Keep it conversational and concise."
-            ),
+            system_prompt=_OOS_SYSTEM_PROMPT,
             user_message=f'{history_context}The user asked: "{query}"',
+            model=settings.groq_fast_model,
         )
     except Exception as e:
-        logger.warning(f"Out-of-scope LLM call failed, using fallback: {e}")
+        logger.warning("Out-of-scope LLM call failed, using fallback: %s", e)
         redirect_response = (
             f"That's an interesting question, but I'm SignalShield AI — I specialize in "
             f"drug safety and pharmacovigilance. Try asking me something like "
@@ -722,41 +989,45 @@ async def out_of_scope_node(state: SignalShieldState) -> dict:
     }
 
 
+_GREETING_SYSTEM_PROMPT = (
+    "You are SignalShield AI — a friendly, professional drug safety and "
+    "pharmacovigilance assistant. The user is greeting you or asking a "
+    "conversational question. Respond warmly and naturally in 2-4 sentences. "
+    "Briefly introduce what you can do (drug safety signals, investigations, "
+    "safety reports, pharma knowledge). "
+    "You monitor a FAERS database with 20 drugs. Three drugs have active safety "
+    "signals you can investigate: Cardizol-X (cardiac arrhythmia spike), "
+    "Neurofen-Plus (hepatotoxicity in elderly females), and Arthrex-200 "
+    "(rhabdomyolysis with statin co-prescription). "
+    "You can suggest the user try asking about one of these drugs. "
+    "End by asking how you can help them today. "
+    "Be conversational — NOT robotic. Do NOT use bullet lists or headers. "
+    "Keep it short and welcoming. "
+    "If there is conversation history provided, acknowledge the ongoing conversation naturally."
+)
+
+
 async def greeting_node(state: SignalShieldState) -> dict:
     """Handles greetings and conversational openers with a natural LLM response."""
     query = state.get("query", "")
-    logger.info(f"Greeting Node: Responding naturally — '{query[:80]}'")
+    logger.info("Greeting Node: Responding naturally — '%s'", query[:80])
 
     # Build conversation context for follow-ups
     history = state.get("conversation_history", [])
     history_context = ""
     if history:
-        recent = history[-4:]
-        history_lines = [f"{'User' if t.get('role')=='user' else 'Assistant'}: {t.get('content','')[:200]}" for t in recent]
-        history_context = "\n\nRecent conversation:\n" + "\n".join(history_lines) + "\n"
+        history_context = "\n\nRecent conversation:\n" + _format_history(history, 4, 200) + "\n"
+
+    from app.config import settings
 
     try:
         greeting_response = await _call_llm_direct(
-            system_prompt=(
-                "You are SignalShield AI — a friendly, professional drug safety and "
-                "pharmacovigilance assistant. The user is greeting you or asking a "
-                "conversational question. Respond warmly and naturally in 2-4 sentences. "
-                "Briefly introduce what you can do (drug safety signals, investigations, "
-                "safety reports, pharma knowledge). "
-                "You monitor a FAERS database with 20 drugs. Three drugs have active safety "
-                "signals you can investigate: Cardizol-X (cardiac arrhythmia spike), "
-                "Neurofen-Plus (hepatotoxicity in elderly females), and Arthrex-200 "
-                "(rhabdomyolysis with statin co-prescription). "
-                "You can suggest the user try asking about one of these drugs. "
-                "End by asking how you can help them today. "
-                "Be conversational — NOT robotic. Do NOT use bullet lists or headers. "
-                "Keep it short and welcoming. "
-                "If there is conversation history provided, acknowledge the ongoing conversation naturally."
-            ),
+            system_prompt=_GREETING_SYSTEM_PROMPT,
             user_message=f"{history_context}{query}",
+            model=settings.groq_fast_model,
         )
     except Exception as e:
-        logger.warning(f"Greeting LLM call failed, using fallback: {e}")
+        logger.warning("Greeting LLM call failed, using fallback: %s", e)
         greeting_response = (
             "Hey there! I'm SignalShield AI, your drug safety assistant. "
             "I can help you scan for safety signals, investigate specific drugs, "
@@ -771,6 +1042,119 @@ async def greeting_node(state: SignalShieldState) -> dict:
     }
 
 
+@lru_cache(maxsize=1)
+def _get_es_client():
+    """Return the shared async Elasticsearch client for knowledge-base (RAG) lookups.
+
+    Built once so its connection pool keeps keep-alive sockets warm across
+    queries instead of paying a fresh TLS handshake per question.
+    """
+    from app.config import settings
+    from elasticsearch import AsyncElasticsearch
+
+    return AsyncElasticsearch(
+        settings.elasticsearch_url,
+        api_key=settings.elasticsearch_api_key,
+        request_timeout=15,
+        http_compress=True,
+    )
+
+
+async def warm_up_backends(timeout: float = 5.0) -> None:
+    """Prime the knowledge-base and Groq connection pools at app startup.
+
+    Best-effort: one ping to Elasticsearch and a 1-token completion per Groq
+    model, run together, so the first user query reuses open keep-alive
+    connections instead of paying the handshakes. Kibana is already
+    contacted by the startup health check. Clients are built inside each
+    guarded call, Groq is skipped without an API key, and the whole warm-up
+    gives up after `timeout` seconds so startup never depends on it.
+    """
+    from app.config import settings
+
+    async def _warm(target: str, make_call) -> None:
+        try:
+            await make_call()
+        except Exception as e:
+            logger.debug("%s warm-up failed: %s", target, e)
+
+    calls = [_warm("Elasticsearch", lambda: _get_es_client().ping())]
+    if settings.groq_api_key:
+        calls += [
+            _warm("Groq", lambda: _get_groq_llm().ainvoke("ping", max_tokens=1)),
+            _warm("Groq (fast model)", lambda: _get_groq_llm(settings.groq_fast_model).ainvoke("ping", max_tokens=1)),
+        ]
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*calls), timeout)
+    except asyncio.TimeoutError:
+        logger.debug("Backend warm-up gave up after %gs", timeout)
+
+
+async def close_es_client() -> None:
+    """Close the shared knowledge-base client if one was created (app shutdown)."""
+    if _get_es_client.cache_info().currsize:
+        await _get_es_client().close()
+        _get_es_client.cache_clear()
+
+
+# Answers to knowledge questions, keyed by normalised query + drug + the
+# history block the answer was conditioned on
+_knowledge_answer_cache: TTLCache = TTLCache(maxsize=512, ttl=900)
+
+
+# Question scaffolding that doesn't change what is being asked
+_QUESTION_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "for", "to", "in",
+    "on", "about", "and", "or", "me", "my", "you", "your", "please", "can",
+    "could", "would", "tell", "explain", "describe", "define", "what", "whats",
+    "does", "do", "mean", "meaning", "i", "want", "know", "give", "some", "it",
+})
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+
+def _question_fingerprint(query: str) -> str:
+    """Content words in their original order, so light paraphrases share a
+    cache entry ("What is PRR?", "Explain PRR", "prr — what does it mean")
+    while reordered questions ("Is PRR higher than ROR?" / "Is ROR higher
+    than PRR?") stay distinct."""
+    words = [w for w in _WORD_RE.findall(query.lower()) if w not in _QUESTION_STOPWORDS]
+    return " ".join(words) or query.strip().lower()
+
+
+# When the semantic (ELSER) search fails — typically no inference endpoint in
+# this deployment — knowledge lookups go BM25-only until this monotonic time
+_SEMANTIC_COOLDOWN_SECONDS = 300
+_semantic_disabled_until = 0.0
+
+# Knowledge hits carry a pre-truncated content_preview (same length as
+# CONTENT_PREVIEW_CHARS in data/generate_knowledge_base.py). Indices built
+# before that field existed only have full content, read on demand instead.
+_KB_PREVIEW_CHARS = 2000
+
+
+def clear_knowledge_cache() -> int:
+    """Drop cached knowledge answers and return how many there were.
+
+    Exposed as POST /api/knowledge/cache/clear so a re-indexed pharma_knowledge
+    is picked up without waiting out the TTL.
+    """
+    dropped = len(_knowledge_answer_cache)
+    _knowledge_answer_cache.clear()
+    return dropped
+
+
+_GK_SYSTEM_PROMPT = (
+    "You are SignalShield AI — a specialist pharmacovigilance and drug safety assistant. "
+    "Answer questions clearly, accurately, and concisely using markdown formatting. "
+    "When context from the knowledge base is provided, use it to ground your answer "
+    "and cite document titles where relevant. "
+    "Focus only on pharmacovigilance, drug safety, drug labels, and related medical topics. "
+    "Do NOT make up data or statistics — if you are uncertain, say so.\n\n"
+    + DEMO_DRUG_SIGNALS_CONTEXT
+)
+
+
 async def general_knowledge_node(state: SignalShieldState) -> dict:
     """Answers general pharmacovigilance / drug-label questions.
 
@@ -783,113 +1167,144 @@ async def general_knowledge_node(state: SignalShieldState) -> dict:
     RAG context from the knowledge base is still retrieved via Elasticsearch
     and injected into the prompt, but NO tools are invoked on the LLM side.
     """
+    global _semantic_disabled_until
     query = state.get("query", "")
     drug = state.get("extracted_drug", "")
-    logger.info(f"General Knowledge Node (Groq direct): '{query[:80]}'")
+    logger.info("General Knowledge Node (Groq direct): '%s'", query[:80])
 
     # Build conversation context for follow-ups
     history = state.get("conversation_history", [])
     history_context = ""
     if history:
-        recent = history[-6:]
-        history_lines = [f"{'User' if t.get('role')=='user' else 'Assistant'}: {t.get('content','')[:300]}" for t in recent]
-        history_context = "\n\nConversation history (for context):\n" + "\n".join(history_lines) + "\n"
-
-    reasoning = [{
-        "agent": "master_orchestrator",
-        "step_type": "thinking",
-        "content": "Looking through our pharma knowledge base...",
-        "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-        "timestamp": _now_iso(),
-    }]
+        history_context = "\n\nConversation history (for context):\n" + _format_history(history, 6, 300) + "\n"
+
+    cache_key = hashlib.blake2b(
+        f"{_question_fingerprint(query)}|{drug}|{history_context}".encode(), digest_size=16
+    ).digest()
+    cached_answer = _knowledge_answer_cache.get(cache_key)
+    if cached_answer is not None:
+        logger.info("General Knowledge Node: answered from cache")
+        return {
+            "status": "complete",
+            "direct_response": cached_answer,
+            "current_agent": "none",
+            "reasoning_trace": [_step(
+                "master_orchestrator",
+                "conclusion",
+                "Here's what I found for you.",
+            )],
+            "progress_messages": ["💡 Knowledge question answered from recent results"],
+        }
+
+    reasoning = [_step(
+        "master_orchestrator",
+        "thinking",
+        "Looking through our pharma knowledge base...",
+    )]
 
     # ── RAG: Pull relevant docs from Elasticsearch ────────────────────────
     rag_context = ""
+    rag_ok = False  # Only answers grounded by a completed search are cached
     try:
-        from app.config import settings
-        from elasticsearch import Elasticsearch
-
-        es = Elasticsearch(
-            settings.elasticsearch_url,
-            api_key=settings.elasticsearch_api_key,
-            request_timeout=15,
-        )
-
-        hits = []
-
-        # 1. Try semantic search (ELSER)
-        try:
-            sem_results = es.search(
-                index="pharma_knowledge",
-                body={
+        es = _get_es_client()
+
+        # Semantic (ELSER) and BM25 go out in one _msearch round-trip; semantic
+        # hits win, BM25 covers a missing inference endpoint or an empty
+        # semantic result. Per-search failures come back as "error" entries.
+        searches = [
+            {"index": "pharma_knowledge"},
+            {
+                "query": {
+                    "multi_match": {
+                        "query": query,
+                        "fields": ["title^3", "content"],
+                        "type": "best_fields",
+                        "fuzziness": "AUTO",
+                    }
+                },
+                "size": 3,
+                "_source": ["title", "category", "content_preview"],
+            },
+        ]
+        use_semantic = time.monotonic() >= _semantic_disabled_until
+        if use_semantic:
+            searches[:0] = [
+                {"index": "pharma_knowledge"},
+                {
                     "query": {"semantic": {"field": "content_semantic", "query": query}},
                     "size": 3,
-                    "_source": ["title", "category", "content"],
+                    "_source": ["title", "category", "content_preview"],
                 },
-            )
+            ]
+
+        msearch = await es.msearch(searches=searches)
+        responses = msearch["responses"]
+        sem_results = responses[0] if use_semantic else None
+        bm25_results = responses[-1]
+
+        hits = []
+        if not use_semantic:
+            logger.info("Semantic search cooling down after a failure, using BM25")
+        elif "error" in sem_results:
+            logger.info("Semantic search unavailable, falling back to BM25")
+            _semantic_disabled_until = time.monotonic() + _SEMANTIC_COOLDOWN_SECONDS
+        else:
+            _semantic_disabled_until = 0.0
             hits = sem_results.get("hits", {}).get("hits", [])
             if hits:
-                logger.info(f"RAG semantic search returned {len(hits)} hits")
-        except Exception:
-            logger.info("Semantic search unavailable, falling back to BM25")
+                logger.info("RAG semantic search returned %s hits", len(hits))
 
-        # 2. Fallback to BM25 full-text
         if not hits:
-            bm25_results = es.search(
+            if "error" in bm25_results:
+                logger.info("BM25 search failed: %s", bm25_results['error'].get('type', 'unknown'))
+            else:
+                hits = bm25_results.get("hits", {}).get("hits", [])
+
+        stale = [hit for hit in hits if "content_preview" not in hit["_source"]]
+        if stale:
+            logger.warning(
+                "pharma_knowledge has no content_preview on %s hit(s); re-run "
+                "data/generate_knowledge_base.py --force. Reading full content instead.",
+                len(stale),
+            )
+            docs = await es.mget(
                 index="pharma_knowledge",
-                body={
-                    "query": {
-                        "multi_match": {
-                            "query": query,
-                            "fields": ["title^3", "content"],
-                            "type": "best_fields",
-                            "fuzziness": "AUTO",
-                        }
-                    },
-                    "size": 3,
-                    "_source": ["title", "category", "content"],
-                },
-                ignore=[404],
+                ids=[hit["_id"] for hit in stale],
+                source_includes=["content"],
             )
-            hits = bm25_results.get("hits", {}).get("hits", [])
+            for hit, doc in zip(stale, docs["docs"]):
+                hit["_source"]["content_preview"] = doc.get("_source", {}).get("content", "")[:_KB_PREVIEW_CHARS]
 
         if hits:
             pieces = []
+            titles = []
             for hit in hits:
                 src = hit["_source"]
+                titles.append(src["title"])
                 pieces.append(
-                    f"--- {src['title']} [{src['category']}] ---\n{src['content'][:2000]}"
+                    f"--- {src['title']} [{src['category']}] ---\n{src.get('content_preview', '')}"
                 )
             rag_context = "\n\n".join(pieces)
-            doc_titles = ", ".join(h["_source"]["title"] for h in hits)
-            reasoning.append({
-                "agent": "master_orchestrator",
-                "step_type": "tool_call",
-                "content": f"Found {len(hits)} relevant reference(s): {doc_titles}",
-                "tool_name": "pharma.search_knowledge",
-                "tool_input": {"search_query": query[:100]},
-                "tool_query": f"Knowledge base search: '{query[:80]}' → {len(hits)} results",
-                "tool_result": doc_titles,
-                "timestamp": _now_iso(),
-            })
+            doc_titles = ", ".join(titles)
+            reasoning.append(_step(
+                "master_orchestrator",
+                "tool_call",
+                f"Found {len(hits)} relevant reference(s): {doc_titles}",
+                tool_name="pharma.search_knowledge",
+                tool_input={"search_query": query[:100]},
+                tool_query=f"Knowledge base search: '{query[:80]}' → {len(hits)} results",
+                tool_result=doc_titles,
+            ))
         else:
             logger.info("RAG returned no hits — answering from LLM knowledge only.")
 
+        rag_ok = (use_semantic and "error" not in sem_results) or "error" not in bm25_results
+
     except Exception as rag_err:
-        logger.warning(f"RAG search failed (non-critical): {rag_err}")
+        logger.warning("RAG search failed (non-critical): %s", rag_err)
 
     # ── Answer via Groq directly (no tools) ──────────────────────────────
     try:
-        system_prompt = (
-            "You are SignalShield AI — a specialist pharmacovigilance and drug safety assistant. "
-            "Answer questions clearly, accurately, and concisely using markdown formatting. "
-            "When context from the knowledge base is provided, use it to ground your answer "
-            "and cite document titles where relevant. "
-            "Focus only on pharmacovigilance, drug safety, drug labels, and related medical topics. "
-            "Do NOT make up data or statistics — if you are uncertain, say so.\n\n"
-            f"{DEMO_DRUG_SIGNALS_CONTEXT}"
-        )
-
         user_message_parts = []
         if rag_context:
             user_message_parts.append(
@@ -905,16 +1320,16 @@ async def general_knowledge_node(state: SignalShieldState) -> dict:
 
         user_message = "\n".join(user_message_parts)
 
-        response_text = await _call_llm_direct(system_prompt, user_message)
-        logger.info(f"General Knowledge Node answered ({len(response_text)} chars)")
+        response_text = await _call_llm_direct(_GK_SYSTEM_PROMPT, user_message)
+        logger.info("General Knowledge Node answered (%s chars)", len(response_text))
+        if rag_ok:
+            _knowledge_answer_cache[cache_key] = response_text
 
-        reasoning.append({
-            "agent": "master_orchestrator",
-            "step_type": "conclusion",
-            "content": "Here's what I found for you.",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
+        reasoning.append(_step(
+            "master_orchestrator",
+            "conclusion",
+            "Here's what I found for you.",
+        ))
 
         return {
             "status": "complete",
@@ -925,7 +1340,7 @@ async def general_knowledge_node(state: SignalShieldState) -> dict:
         }
 
     except Exception as e:
-        logger.error(f"General Knowledge Node (Groq direct) failed: {e}")
+        logger.error("General Knowledge Node (Groq direct) failed: %s", e)
         return {
             "status": "error",
             "direct_response": f"Sorry, I couldn't answer that question: {str(e)}",
@@ -942,16 +1357,15 @@ async def scan_signals_node(state: SignalShieldState) -> dict:
     query = state.get("query", "Scan for any emerging drug safety signals in FAERS data from the last 90 days")
 
     reasoning = []
-    reasoning.append({
-        "agent": "signal_scanner",
-        "step_type": "thinking",
-        "content": "Scanning the safety database for unusual patterns...",
-        "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-        "timestamp": _now_iso(),
-    })
+    reasoning.append(_step(
+        "signal_scanner",
+        "thinking",
+        "Scanning the safety database for unusual patterns...",
+    ))
+    _emit_steps("scan_signals", reasoning)
 
     try:
-        result = await elastic_agent_client.converse(
+        result = await cached_converse(
             agent_id="signal_scanner",
             message=query,
             conversation_id=state.get("scanner_conversation_id"),
@@ -967,34 +1381,28 @@ async def scan_signals_node(state: SignalShieldState) -> dict:
         # Parse structured signals from response — try text first, fallback to raw steps
         signals = _extract_signals_from_response(response_text, raw_result=result)
 
-        logger.info(f"Signal Scanner found {len(signals)} potential signals")
-
-        # Store raw response in each signal
-        for s in signals:
-            s["raw_response"] = response_text
+        logger.info("Signal Scanner found %s potential signals", len(signals))
 
         # Add conclusion step
         if signals:
             drug_list = ", ".join(s['drug_name'] for s in signals)
-            reasoning.append({
-                "agent": "signal_scanner",
-                "step_type": "conclusion",
-                "content": f"Found {len(signals)} potential safety concern(s) involving: {drug_list}. Investigating further...",
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
+            reasoning.append(_step(
+                "signal_scanner",
+                "conclusion",
+                f"Found {len(signals)} potential safety concern(s) involving: {drug_list}. Investigating further...",
+            ))
         else:
-            reasoning.append({
-                "agent": "signal_scanner",
-                "step_type": "conclusion",
-                "content": "Scan complete — no safety concerns found in the recent data.",
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
+            reasoning.append(_step(
+                "signal_scanner",
+                "conclusion",
+                "Scan complete — no safety concerns found in the recent data.",
+            ))
 
         return {
             "status": "investigating" if signals else "complete",
             "signals": signals,
+            # Kept once at state level rather than copied into every signal
+            "scanner_raw_response": response_text,
             "scanner_conversation_id": conversation_id,
             "current_agent": "case_investigator" if signals else "none",
             "total_signals_found": len(signals),
@@ -1005,14 +1413,12 @@ async def scan_signals_node(state: SignalShieldState) -> dict:
         }
 
     except Exception as e:
-        logger.error(f"Signal Scanner failed: {e}")
-        reasoning.append({
-            "agent": "signal_scanner",
-            "step_type": "conclusion",
-            "content": "Something went wrong during the safety scan. Please try again.",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
+        logger.error("Signal Scanner failed: %s", e)
+        reasoning.append(_step(
+            "signal_scanner",
+            "conclusion",
+            "Something went wrong during the safety scan. Please try again.",
+        ))
         return {
             "status": "error",
             "errors": [f"Signal Scanner error: {str(e)}"],
@@ -1035,7 +1441,7 @@ async def investigate_cases_node(state: SignalShieldState) -> dict:
     if not signals and state.get("extracted_drug"):
         drug = state.get("extracted_drug", "")
         reaction = state.get("extracted_reaction", "")
-        logger.info(f"No scanner signals — creating direct investigation for {drug}")
+        logger.info("No scanner signals — creating direct investigation for %s", drug)
         signals = [{
             "drug_name": drug,
             "reaction_term": reaction or "All adverse events",
@@ -1056,113 +1462,135 @@ async def investigate_cases_node(state: SignalShieldState) -> dict:
     investigations = []
     reasoning = []
 
-    reasoning.append({
-        "agent": "case_investigator",
-        "step_type": "thinking",
-        "content": f"Digging deeper into {len(signals)} flagged drug(s) — checking patient details, interactions, and outcomes...",
-        "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-        "timestamp": _now_iso(),
-    })
-
-    # ── Investigate all signals in PARALLEL for speed ──────────────────
-    async def _investigate_one(i: int, signal: dict) -> tuple[dict, list[dict]]:
-        """Investigate a single signal. Returns (investigation, reasoning_steps)."""
-        drug = signal.get("drug_name", "Unknown")
-        reaction = signal.get("reaction_term", "Unknown")
-        steps = []
-
-        logger.info(f"Investigating signal {i+1}/{len(signals)}: {drug} → {reaction}")
-
-        steps.append({
-            "agent": "case_investigator",
-            "step_type": "thinking",
-            "content": f"Reviewing {drug} ({i+1} of {len(signals)}) — looking at who was affected and how...",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
-
-        message = (
-            f"Investigate this flagged drug safety signal:\n"
-            f"Drug: {drug}\n"
-            f"Reaction: {reaction}\n"
-            f"PRR: {signal.get('prr', 'N/A')}\n"
-            f"Recent cases (90d): {signal.get('case_count', 'N/A')}\n"
-            f"Spike ratio: {signal.get('spike_ratio', 'N/A')}x\n\n"
-            f"Please perform a full investigation covering demographics, "
-            f"concomitant drugs, outcome severity, and geographic distribution."
-        )
+    # Demographics, co-medications and geography are drug-level, so all of a
+    # drug's flagged reactions are covered by one investigator call
+    signals_by_drug: dict[str, list[dict]] = {}
+    for signal in signals:
+        signals_by_drug.setdefault(signal.get("drug_name", "Unknown"), []).append(signal)
+
+    reasoning.append(_step(
+        "case_investigator",
+        "thinking",
+        f"Digging deeper into {len(signals_by_drug)} flagged drug(s) — checking patient details, interactions, and outcomes...",
+    ))
+    _emit_steps("investigate_cases", reasoning)
+
+    # ── Investigate all drugs in one concurrent batch ──────────────────
+    targets = []
+    messages = []
+    for i, (drug, drug_signals) in enumerate(signals_by_drug.items()):
+        reactions = [sig.get("reaction_term", "Unknown") for sig in drug_signals]
+        # The record is filed under its most severe reaction and keeps the rest
+        lead = max(drug_signals, key=_signal_rank)
+        logger.info("Investigating drug %s/%s: %s → %s", i+1, len(signals_by_drug), drug, "; ".join(reactions))
+        targets.append((drug, lead.get("reaction_term", "Unknown"), reactions))
+
+        if len(drug_signals) == 1:
+            signal = drug_signals[0]
+            messages.append(INVESTIGATE_MESSAGE_TEMPLATE.format(
+                drug=drug,
+                reaction=reactions[0],
+                prr=signal.get("prr", "N/A"),
+                case_count=signal.get("case_count", "N/A"),
+                spike_ratio=signal.get("spike_ratio", "N/A"),
+            ))
+        else:
+            messages.append(INVESTIGATE_MULTI_MESSAGE_TEMPLATE.format(
+                drug=drug,
+                signal_lines="\n".join(
+                    INVESTIGATE_SIGNAL_LINE_TEMPLATE.format(
+                        reaction=sig.get("reaction_term", "Unknown"),
+                        prr=sig.get("prr", "N/A"),
+                        case_count=sig.get("case_count", "N/A"),
+                        spike_ratio=sig.get("spike_ratio", "N/A"),
+                    )
+                    for sig in drug_signals
+                ),
+            ))
+
+    def _record_one(i: int, drug: str, reaction: str, reactions: list[str], result) -> tuple[dict, list[dict], str]:
+        """Turn one agent result (or its exception) into (investigation, reasoning_steps, conversation_id)."""
+        steps = [_step(
+            "case_investigator",
+            "thinking",
+            f"Reviewing {drug} ({i+1} of {len(targets)}) — looking at who was affected and how...",
+        )]
+
+        if isinstance(result, Exception):
+            logger.error("Investigation failed for %s: %s: %s", drug, type(result).__name__, result)
+            steps.append(_step(
+                "case_investigator",
+                "conclusion",
+                f"Couldn't complete the review for {drug}. Please try again.",
+            ))
+            return {
+                "drug_name": drug,
+                "reaction_term": reaction,
+                "reaction_terms": reactions,
+                "raw_response": f"Error: {str(result)}",
+                "overall_assessment": f"Investigation failed: {str(result)}",
+            }, steps, ""
 
-        try:
-            result = await elastic_agent_client.converse(
-                agent_id="case_investigator",
-                message=message,
-                # Each parallel call gets its own conversation (no shared ID)
-            )
+        agent_reasoning = _extract_reasoning_from_response("case_investigator", result)
+        steps.extend(agent_reasoning)
 
-            agent_reasoning = _extract_reasoning_from_response("case_investigator", result)
-            steps.extend(agent_reasoning)
+        response, assessment = _split_assessment(result["response"] or "")
+        interaction_detected = assessment.get("interaction_detected")
+        if not isinstance(interaction_detected, bool):
+            match = _INTERACTION_RE.search(response)
+            interaction_detected = bool(match) and match.group(1).lower() == "yes"
 
-            investigation = {
-                "drug_name": drug,
-                "reaction_term": reaction,
-                "raw_response": result["response"],
-                "demographics_summary": "",
-                "concomitant_drugs": [],
-                "interaction_detected": False,
-                "fatality_rate": 0.0,
-                "serious_rate": 0.0,
-                "geo_distribution": "",
-                "overall_assessment": result["response"][-500:] if result["response"] else "",
-            }
+        investigation = {
+            "drug_name": drug,
+            "reaction_term": reaction,
+            "reaction_terms": reactions,
+            "raw_response": response,
+            "interaction_detected": interaction_detected,
+            "overall_assessment": response[-500:],
+        }
 
-            resp_lower = result["response"].lower()
-            if "interaction" in resp_lower and ("yes" in resp_lower or "detected" in resp_lower or "potential" in resp_lower):
-                investigation["interaction_detected"] = True
-
-            interaction_note = "Found a possible drug interaction." if investigation['interaction_detected'] else "No major drug interactions found."
-            steps.append({
-                "agent": "case_investigator",
-                "step_type": "conclusion",
-                "content": f"Finished reviewing {drug}. {interaction_note}",
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
+        interaction_note = "Found a possible drug interaction." if investigation['interaction_detected'] else "No major drug interactions found."
+        steps.append(_step(
+            "case_investigator",
+            "conclusion",
+            f"Finished reviewing {drug}. {interaction_note}",
+        ))
 
-            return investigation, steps
+        return investigation, steps, result.get("conversation_id", "")
 
+    async def _investigate_and_emit(i: int, message: str) -> tuple[dict, list[dict], str]:
+        """Investigate one drug, streaming its steps the moment that call is done."""
+        drug, reaction, reactions = targets[i]
+        try:
+            # Each call gets its own conversation (no shared ID)
+            result = await cached_converse(agent_id="case_investigator", message=message)
         except Exception as e:
-            logger.error(f"Investigation failed for {drug}: {type(e).__name__}: {e}")
-            steps.append({
-                "agent": "case_investigator",
-                "step_type": "conclusion",
-                "content": f"Couldn't complete the review for {drug}. Please try again.",
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
-            return {
-                "drug_name": drug,
-                "reaction_term": reaction,
-                "raw_response": f"Error: {str(e)}",
-                "overall_assessment": f"Investigation failed: {str(e)}",
-            }, steps
+            result = e
+        outcome = _record_one(i, drug, reaction, reactions, result)
+        _emit_steps("investigate_cases", outcome[1])
+        return outcome
 
-    # Run all investigations concurrently
+    # All drugs are investigated concurrently; results stay in drug order
     results = await asyncio.gather(
-        *[_investigate_one(i, sig) for i, sig in enumerate(signals)]
+        *[_investigate_and_emit(i, message) for i, message in enumerate(messages)]
     )
 
-    for inv, steps in results:
+    conversation_ids = []
+    for inv, steps, conv_id in results:
         investigations.append(inv)
         reasoning.extend(steps)
+        if conv_id:
+            conversation_ids.append(conv_id)
 
     return {
         "status": "reporting",
         "investigations": investigations,
+        "investigator_conversation_ids": conversation_ids,
         "current_agent": "safety_reporter",
         "total_investigations": len(investigations),
         "reasoning_trace": reasoning,
         "progress_messages": [
-            f"Case Investigator completed: {len(investigations)} signal(s) investigated"
+            f"Case Investigator completed: {len(signals)} signal(s) investigated"
         ],
     }
 
@@ -1184,50 +1612,85 @@ async def generate_reports_node(state: SignalShieldState) -> dict:
     reports = []
     reasoning = []
 
-    reasoning.append({
-        "agent": "safety_reporter",
-        "step_type": "thinking",
-        "content": f"Writing safety report(s) for {len(investigations)} drug(s)...",
-        "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-        "timestamp": _now_iso(),
-    })
+    # Index signals once instead of rescanning them per investigation. An
+    # investigation can cover several of a drug's reactions, so match each on
+    # (drug, reaction) and fall back to the first signal seen for the drug.
+    signals_by_key = {}
+    signals_by_drug = {}
+    for s in signals:
+        drug_name = s.get("drug_name")
+        if drug_name:
+            signals_by_key.setdefault((drug_name, s.get("reaction_term")), s)
+            signals_by_drug.setdefault(drug_name, s)
+
+    reasoning.append(_step(
+        "safety_reporter",
+        "thinking",
+        f"Writing safety report(s) for {len(investigations)} drug(s)...",
+    ))
+    _emit_steps("generate_reports", reasoning)
+
+    def _matching_signals(investigation: dict) -> list[dict]:
+        drug = investigation.get("drug_name", "Unknown")
+        reactions = investigation.get("reaction_terms") or [investigation.get("reaction_term", "Unknown")]
+        matched = [signals_by_key[(drug, r)] for r in reactions if (drug, r) in signals_by_key]
+        if not matched and drug in signals_by_drug:
+            matched = [signals_by_drug[drug]]
+        return matched
+
+    def _group_priority(investigation: dict) -> Optional[str]:
+        """Highest priority across the investigation's signals (None if unmatched)."""
+        matched = _matching_signals(investigation)
+        return max(matched, key=_signal_rank).get("priority", "MEDIUM").upper() if matched else None
 
     # ── Generate all reports in PARALLEL for speed ─────────────────────
-    async def _generate_one(i: int, investigation: dict) -> tuple[dict, list[dict]]:
-        """Generate a single safety report. Returns (report, reasoning_steps)."""
+    async def _generate_one(i: int, investigation: dict) -> tuple[dict, list[dict], str]:
+        """Generate a single safety report. Returns (report, reasoning_steps, conversation_id)."""
         drug = investigation.get("drug_name", "Unknown")
         reaction = investigation.get("reaction_term", "Unknown")
+        reactions = investigation.get("reaction_terms") or [reaction]
         steps = []
 
-        logger.info(f"Generating report {i+1}/{len(investigations)}: {drug} → {reaction}")
-
-        matching_signal = next(
-            (s for s in signals if s.get("drug_name") == drug),
-            {},
-        )
-
-        steps.append({
-            "agent": "safety_reporter",
-            "step_type": "thinking",
-            "content": f"Gathering all findings for {drug} to prepare the report...",
-            "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-            "timestamp": _now_iso(),
-        })
-
-        message = (
-            f"Generate a Drug Safety Signal Assessment Report for:\n\n"
-            f"Drug: {drug}\n"
-            f"Reaction: {reaction}\n"
-            f"PRR: {matching_signal.get('prr', 'N/A')}\n"
-            f"Spike ratio: {matching_signal.get('spike_ratio', 'N/A')}x\n"
-            f"Priority: {matching_signal.get('priority', 'N/A')}\n\n"
-            f"Investigation findings:\n{investigation.get('raw_response', 'No findings available')}\n\n"
-            f"Please compile the full data using pharma.compile_signal_summary for {drug} "
-            f"and generate the complete structured safety report."
-        )
+        logger.info("Generating report %s/%s: %s → %s", i+1, len(investigations), drug, "; ".join(reactions))
+
+        matching_signals = _matching_signals(investigation)
+        priority = _group_priority(investigation)
+
+        steps.append(_step(
+            "safety_reporter",
+            "thinking",
+            f"Gathering all findings for {drug} to prepare the report...",
+        ))
+
+        if len(matching_signals) > 1:
+            message = REPORT_MULTI_MESSAGE_TEMPLATE.format(
+                drug=drug,
+                signal_lines="\n".join(
+                    REPORT_SIGNAL_LINE_TEMPLATE.format(
+                        reaction=sig.get("reaction_term", "Unknown"),
+                        prr=sig.get("prr", "N/A"),
+                        case_count=sig.get("case_count", "N/A"),
+                        spike_ratio=sig.get("spike_ratio", "N/A"),
+                        priority=sig.get("priority", "N/A"),
+                    )
+                    for sig in matching_signals
+                ),
+                priority=priority,
+                findings=investigation.get("raw_response", "No findings available"),
+            )
+        else:
+            matching_signal = matching_signals[0] if matching_signals else {}
+            message = REPORT_MESSAGE_TEMPLATE.format(
+                drug=drug,
+                reaction=reaction,
+                prr=matching_signal.get("prr", "N/A"),
+                spike_ratio=matching_signal.get("spike_ratio", "N/A"),
+                priority=matching_signal.get("priority", "N/A"),
+                findings=investigation.get("raw_response", "No findings available"),
+            )
 
         try:
-            result = await elastic_agent_client.converse(
+            result = await cached_converse(
                 agent_id="safety_reporter",
                 message=message,
                 # Each parallel call gets its own conversation (no shared ID)
@@ -1236,64 +1699,85 @@ async def generate_reports_node(state: SignalShieldState) -> dict:
             agent_reasoning = _extract_reasoning_from_response("safety_reporter", result)
             steps.extend(agent_reasoning)
 
-            signal_priority = matching_signal.get("priority", "MEDIUM").upper()
-            risk_level = signal_priority
-
-            resp_upper = result["response"].upper()
-            if "CRITICAL" in resp_upper and risk_level not in ("CRITICAL",):
-                risk_level = "CRITICAL"
-            elif "HIGH RISK" in resp_upper and risk_level == "LOW":
-                risk_level = "HIGH"
-            elif "LOW RISK" in resp_upper and risk_level in ("MEDIUM",):
-                risk_level = "LOW"
+            report_markdown, assessment = _split_assessment(result["response"] or "")
+            risk_level = _RISK_LEVELS.get(str(assessment.get("risk_level", "")).upper())
+
+            if risk_level is None:
+                # No usable ASSESSMENT line — start from the highest signal
+                # priority and let risk wording in the report adjust it; one
+                # scan collects every mention, no upper-cased copy of the report
+                risk_level = priority or "MEDIUM"
+                risk_mentions = {m.group().upper() for m in _RISK_RE.finditer(report_markdown)}
+                if "CRITICAL" in risk_mentions and risk_level not in ("CRITICAL",):
+                    risk_level = "CRITICAL"
+                elif "HIGH RISK" in risk_mentions and risk_level == "LOW":
+                    risk_level = "HIGH"
+                elif "LOW RISK" in risk_mentions and risk_level in ("MEDIUM",):
+                    risk_level = "LOW"
 
             report = {
                 "drug_name": drug,
                 "reaction_term": reaction,
+                "reaction_terms": reactions,
                 "risk_level": risk_level,
-                "report_markdown": result["response"],
-                "evidence_summary": "",
-                "recommended_actions": [],
+                "report_markdown": report_markdown,
             }
 
-            steps.append({
-                "agent": "safety_reporter",
-                "step_type": "conclusion",
-                "content": f"Safety report for {drug} is ready. Risk level: {risk_level}.",
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
+            steps.append(_step(
+                "safety_reporter",
+                "conclusion",
+                f"Safety report for {drug} is ready. Risk level: {risk_level}.",
+            ))
 
-            return report, steps
+            return report, steps, result.get("conversation_id", "")
 
         except Exception as e:
-            logger.error(f"Report generation failed for {drug}: {type(e).__name__}: {e}")
-            steps.append({
-                "agent": "safety_reporter",
-                "step_type": "conclusion",
-                "content": f"Couldn't generate the report for {drug}. Please try again.",
-                "tool_name": "", "tool_input": {}, "tool_query": "", "tool_result": "",
-                "timestamp": _now_iso(),
-            })
+            logger.error("Report generation failed for %s: %s: %s", drug, type(e).__name__, e)
+            steps.append(_step(
+                "safety_reporter",
+                "conclusion",
+                f"Couldn't generate the report for {drug}. Please try again.",
+            ))
             return {
                 "drug_name": drug,
                 "reaction_term": reaction,
+                "reaction_terms": reactions,
                 "risk_level": "UNKNOWN",
                 "report_markdown": f"Report generation failed: {str(e)}",
-            }, steps
-
-    # Run all report generations concurrently
-    results = await asyncio.gather(
-        *[_generate_one(i, inv) for i, inv in enumerate(investigations)]
+            }, steps, ""
+
+    async def _generate_and_emit(i: int, investigation: dict) -> tuple[dict, list[dict], str]:
+        """_generate_one, streaming its steps the moment that report is done."""
+        outcome = await _generate_one(i, investigation)
+        _emit_steps("generate_reports", outcome[1])
+        return outcome
+
+    # Run all report generations concurrently. Agent calls are admitted in
+    # dispatch order once the concurrency cap is hit, so the shorter
+    # LOW/MEDIUM reports go first and free their slots early; results are
+    # put back in investigation order afterwards.
+    dispatch_order = sorted(
+        range(len(investigations)),
+        key=lambda i: (_group_priority(investigations[i]) or "MEDIUM") in {"HIGH", "CRITICAL"},
+    )
+    dispatched = await asyncio.gather(
+        *[_generate_and_emit(i, investigations[i]) for i in dispatch_order]
     )
+    results = [None] * len(investigations)
+    for i, result in zip(dispatch_order, dispatched):
+        results[i] = result
 
-    for rpt, steps in results:
+    conversation_ids = []
+    for rpt, steps, conv_id in results:
         reports.append(rpt)
         reasoning.extend(steps)
+        if conv_id:
+            conversation_ids.append(conv_id)
 
     return {
         "status": "complete",
         "reports": reports,
+        "reporter_conversation_ids": conversation_ids,
         "current_agent": "none",
         "total_reports": len(reports),
         "reasoning_trace": reasoning,
@@ -1326,9 +1810,9 @@ async def compile_results_node(state: SignalShieldState) -> dict:
             f"Reports generated: {len(reports)}."
         )
         # Log high-priority signals
-        high_priority = [s for s in signals if s.get("priority") in ("HIGH", "CRITICAL")]
-        if high_priority:
-            summary += f" ⚠ HIGH PRIORITY signals: {len(high_priority)}."
+        high_priority_count = sum(1 for s in signals if s.get("priority") in {"HIGH", "CRITICAL"})
+        if high_priority_count:
+            summary += f" ⚠ HIGH PRIORITY signals: {high_priority_count}."
     else:
         summary = "Investigation complete."
 
@@ -4,20 +4,34 @@ Defines the typed state that flows through the multi-agent graph:
 Signal Scanner → Case Investigator → Safety Reporter
 """
 
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, NotRequired, TypeVar
 from operator import add
 
 
-class ReasoningStep(TypedDict, total=False):
-    """A single reasoning step from an agent — tool call, thought, or result."""
+T = TypeVar("T")
+
+# Append-only channel type: node updates are concatenated onto the state
+AppendList = Annotated[list[T], add]
+
+
+class ReasoningStepCore(TypedDict):
+    """Fields every reasoning step carries."""
+    id: int             # Unique per process; dedupes streamed vs. final copies
     agent: str          # signal_scanner | case_investigator | safety_reporter
     step_type: str      # thinking | tool_call | tool_result | conclusion
     content: str        # The reasoning text or tool description
+    timestamp: str      # ISO timestamp
+
+
+class ReasoningStep(ReasoningStepCore, total=False):
+    """A single reasoning step from an agent — tool call, thought, or result.
+
+    The tool fields are only present on steps that describe a tool call.
+    """
     tool_name: str      # e.g. pharma.calculate_reporting_ratio
     tool_input: dict    # e.g. {"drug_name": "Cardizol-X", "reaction_term": "Arrhythmia"}
     tool_query: str     # The ES|QL query that was executed
     tool_result: str    # Summarized result from the tool
-    timestamp: str      # ISO timestamp
 
 
 class SignalRecord(TypedDict):
@@ -35,14 +49,18 @@ class InvestigationRecord(TypedDict):
     """Investigation findings for a single signal."""
     drug_name: str
     reaction_term: str
-    demographics_summary: str
-    concomitant_drugs: list[str]
     interaction_detected: bool
-    fatality_rate: float
-    serious_rate: float
-    geo_distribution: str
     overall_assessment: str
     raw_response: str
+    # Every flagged reaction covered by this investigation (a drug's signals
+    # are investigated together); reaction_term is the highest-priority one
+    reaction_terms: NotRequired[list[str]]
+    # Structured findings — only present once parsed out of the agent response
+    demographics_summary: NotRequired[str]
+    concomitant_drugs: NotRequired[list[str]]
+    fatality_rate: NotRequired[float]
+    serious_rate: NotRequired[float]
+    geo_distribution: NotRequired[str]
 
 
 class SafetyReport(TypedDict):
@@ -50,9 +68,11 @@ class SafetyReport(TypedDict):
     drug_name: str
     reaction_term: str
     risk_level: str  # CRITICAL, HIGH, MODERATE, LOW
+    reaction_terms: NotRequired[list[str]]  # All reactions the report covers
     report_markdown: str
-    evidence_summary: str
-    recommended_actions: list[str]
+    # Only present once parsed out of the agent response
+    evidence_summary: NotRequired[str]
+    recommended_actions: NotRequired[list[str]]
 
 
 class SignalShieldState(TypedDict):
@@ -75,22 +95,24 @@ class SignalShieldState(TypedDict):
     direct_response: str  # For general/data_query — direct answer string
 
     # Agent outputs (append-only lists)
-    signals: Annotated[list[dict], add]
-    investigations: Annotated[list[dict], add]
-    reports: Annotated[list[dict], add]
+    signals: AppendList[SignalRecord]
+    investigations: AppendList[InvestigationRecord]
+    reports: AppendList[SafetyReport]
+    scanner_raw_response: str  # Full Signal Scanner response, shared by all signals
 
     # Conversation tracking
     scanner_conversation_id: str
-    investigator_conversation_id: str
-    reporter_conversation_id: str
+    # Investigation / reporting fan out one conversation per signal
+    investigator_conversation_ids: list[str]
+    reporter_conversation_ids: list[str]
 
     # Progress tracking
     current_agent: str
-    progress_messages: Annotated[list[str], add]
-    errors: Annotated[list[str], add]
+    progress_messages: AppendList[str]
+    errors: AppendList[str]
 
     # Agent reasoning transparency (append-only)
-    reasoning_trace: Annotated[list[dict], add]
+    reasoning_trace: AppendList[ReasoningStep]
 
     # Metadata
     total_signals_found: int
@@ -8,15 +8,20 @@ Signal 2: Neurofen-Plus → hepatotoxicity in 65+ females (rising trend)
 Signal 3: Arthrex-200 → rhabdomyolysis with statin co-prescription
 """
 
-import json
-import random
-import uuid
+import os
 import argparse
 import logging
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
+from typing import Iterable, Iterator
 
-from elasticsearch import Elasticsearch, helpers
+import numpy as np
+import orjson
+from elasticsearch import Elasticsearch
+from elasticsearch.serializer import JsonSerializer
 from faker import Faker
 from tqdm import tqdm
 
@@ -25,7 +30,7 @@ logger = logging.getLogger(__name__)
 
 fake = Faker()
 Faker.seed(42)
-random.seed(42)
+rng = np.random.default_rng(42)
 
 # ── Pharmaceutical Domain Data ───────────────────────────
 
@@ -107,203 +112,280 @@ SERIOUSNESS_CRITERIA = [
 AGE_GROUPS = ["Neonate", "Infant", "Child", "Adolescent", "Adult", "Elderly"]
 
 
-def _pick_country():
-    """Weighted country selection."""
-    r = random.random()
-    cumulative = 0
-    for name, code, weight in REPORTER_COUNTRIES:
-        cumulative += weight
-        if r <= cumulative:
-            return name, code
-    return "Other", "OT"
-
-
-def _pick_age_group(age: int) -> str:
-    if age < 1:
-        return "Neonate"
-    elif age < 2:
-        return "Infant"
-    elif age < 12:
-        return "Child"
-    elif age < 18:
-        return "Adolescent"
-    elif age < 65:
-        return "Adult"
-    else:
-        return "Elderly"
-
-
-def _pick_concomitant_drugs(primary_drug: str, count: int = None) -> list:
-    """Pick random concomitant drugs (excluding the primary drug)."""
-    if count is None:
-        count = random.choices([0, 1, 2, 3], weights=[0.3, 0.35, 0.25, 0.1])[0]
-    available = [d[0] for d in DRUG_CATALOG if d[0] != primary_drug]
-    return random.sample(available, min(count, len(available)))
-
-
-def generate_baseline_report(report_date: datetime) -> dict:
-    """Generate a standard (non-signal) adverse event report."""
-    drug = random.choice(DRUG_CATALOG)
-    age = random.randint(18, 90)
-    sex = random.choice(["Male", "Female"])
-    country_name, country_code = _pick_country()
-    is_serious = random.random() < 0.25
-    reaction = random.choice(REACTION_TERMS[:30])  # Common reactions
-
-    outcome = random.choices(
-        OUTCOMES, weights=[0.35, 0.25, 0.20, 0.05, 0.15]
-    )[0]
+# Vectorized sampling: each generator draws one NumPy array per field for a
+# whole batch of reports, and rows only become dicts in _rows().
+
+DRUG_FIELDS = np.array(DRUG_CATALOG, dtype=object)  # (n_drugs, 4)
+DRUG_NAMES = DRUG_FIELDS[:, 0]
+DRUG_INDEX = {name: i for i, name in enumerate(DRUG_NAMES)}
+
+_COUNTRY_NAMES = np.array([c[0] for c in REPORTER_COUNTRIES], dtype=object)
+_COUNTRY_CODES = np.array([c[1] for c in REPORTER_COUNTRIES], dtype=object)
+_COUNTRY_P = np.array([c[2] for c in REPORTER_COUNTRIES])
+_COUNTRY_P /= _COUNTRY_P.sum()
+
+# Lowercase forms of the terms narratives embed mid-sentence, so .lower()
+# runs once per term instead of once per report
+_LOWER = {
+    term: term.lower()
+    for term in [*REACTION_TERMS, *DRUG_FIELDS[:, 2].tolist(), "Male", "Female"]
+}
+
+# Lower age bounds of Infant, Child, Adolescent, Adult, Elderly
+_AGE_GROUP_BOUNDS = [1, 2, 12, 18, 65]
+
+# All reports fall within two years before NOW at day granularity, so every
+# date string is formatted once here and looked up by day offset. Receive
+# dates trail report dates by up to 30 days and can land after NOW.
+NOW = np.datetime64("2026-02-01T00:00:00", "s")
+MAX_DAYS_AGO = 730
+MAX_RECEIVE_LAG_DAYS = 30
+DATE_STR = np.array(
+    [
+        d + "Z"
+        for d in np.datetime_as_string(
+            NOW - np.arange(-MAX_RECEIVE_LAG_DAYS, MAX_DAYS_AGO + 1).astype("timedelta64[D]"),
+            unit="s",
+        ).tolist()
+    ],
+    dtype=object,
+)
+
+
+def _choice(values: list, n: int, p: list = None) -> np.ndarray:
+    """n (optionally weighted) draws from `values` as an object array."""
+    return rng.choice(np.array(values, dtype=object), n, p=p)
+
+
+def _date_str(days_ago: np.ndarray) -> np.ndarray:
+    """ISO timestamps for reports dated `days_ago` days before NOW."""
+    return DATE_STR[days_ago + MAX_RECEIVE_LAG_DAYS]
+
+
+def _report_ids(n: int) -> list[str]:
+    """n random 12-hex-digit report IDs, drawn from one os.urandom call."""
+    raw = os.urandom(6 * n).hex().upper()
+    return [f"FAERS-{raw[i:i + 12]}" for i in range(0, 12 * n, 12)]
+
+
+def _pick_country(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Weighted country selection: (names, codes)."""
+    idx = rng.choice(len(REPORTER_COUNTRIES), n, p=_COUNTRY_P)
+    return _COUNTRY_NAMES[idx], _COUNTRY_CODES[idx]
+
+
+def _pick_age_group(ages: np.ndarray) -> np.ndarray:
+    return np.array(AGE_GROUPS, dtype=object)[np.digitize(ages, _AGE_GROUP_BOUNDS)]
+
+
+def _pick_concomitant_drugs(primary_idx: np.ndarray, counts: np.ndarray = None) -> list[list]:
+    """Pick random concomitant drugs per report (excluding its primary drug).
+
+    Sampling without replacement is done for the whole batch at once: each
+    row ranks random keys and keeps its `count` lowest, with the primary
+    drug's key pinned to +inf so it is never picked.
+    """
+    n = len(primary_idx)
+    if counts is None:
+        counts = rng.choice(4, n, p=[0.3, 0.35, 0.25, 0.1])
+    keys = rng.random((n, len(DRUG_CATALOG)))
+    keys[np.arange(n), primary_idx] = np.inf
+    picks = DRUG_NAMES[np.argsort(keys, axis=1)[:, :3]].tolist()
+    return [row[:k] for row, k in zip(picks, counts.tolist())]
+
+
+def _rows(columns: dict) -> list[dict]:
+    """Zip per-field columns into report dicts. Scalar values are shared by
+    every row; NumPy columns are converted to plain Python values."""
+    keys = list(columns)
+    values = [
+        v.tolist() if isinstance(v, np.ndarray) else v if isinstance(v, list) else repeat(v)
+        for v in columns.values()
+    ]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def generate_baseline_reports(days_ago: np.ndarray) -> dict:
+    """Generate standard (non-signal) adverse event reports, one per entry of days_ago."""
+    n = len(days_ago)
+    drug_idx = rng.integers(0, len(DRUG_CATALOG), n)
+    drugs = DRUG_FIELDS[drug_idx]
+    ages = rng.integers(18, 91, n)
+    sexes = _choice(["Male", "Female"], n)
+    country_names, country_codes = _pick_country(n)
+    is_serious = rng.random(n) < 0.25
+    reactions = _choice(REACTION_TERMS[:30], n)  # Common reactions
+
+    outcomes = _choice(OUTCOMES, n, p=[0.35, 0.25, 0.20, 0.05, 0.15])
 
     return {
-        "report_id": f"FAERS-{uuid.uuid4().hex[:12].upper()}",
-        "report_date": report_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "receive_date": (report_date + timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "reporter_type": random.choice(REPORTER_TYPES),
-        "reporter_country": country_name,
-        "reporter_country_code": country_code,
-        "report_source": random.choice(["Direct", "Literature", "Study", "Other"]),
+        "report_id": _report_ids(n),
+        "report_date": _date_str(days_ago),
+        "receive_date": _date_str(days_ago - rng.integers(1, 31, n)),
+        "reporter_type": _choice(REPORTER_TYPES, n),
+        "reporter_country": country_names,
+        "reporter_country_code": country_codes,
+        "report_source": _choice(["Direct", "Literature", "Study", "Other"], n),
         "serious": is_serious,
-        "seriousness_criteria": random.choice(SERIOUSNESS_CRITERIA) if is_serious else None,
-        "patient_age": age,
-        "patient_age_group": _pick_age_group(age),
-        "patient_sex": sex,
-        "patient_weight_kg": round(random.gauss(75, 15), 1),
-        "drug_name": drug[0],
-        "drug_generic_name": drug[1],
-        "drug_characterization": random.choice(["Primary suspect", "Secondary suspect", "Concomitant"]),
-        "drug_indication": drug[2],
-        "drug_route": drug[3],
-        "drug_dose": f"{random.choice([5, 10, 20, 25, 50, 100, 200, 500])}mg daily",
-        "concomitant_drugs": _pick_concomitant_drugs(drug[0]),
-        "reaction_term": reaction,
-        "reaction_meddra_pt": reaction,
-        "reaction_outcome": outcome,
-        "outcome_detail": random.choice(OUTCOME_DETAILS) if is_serious else None,
-        "narrative": f"Patient ({age}y {sex}) reported {reaction.lower()} while taking {drug[0]} for {drug[2].lower()}.",
+        "seriousness_criteria": np.where(is_serious, _choice(SERIOUSNESS_CRITERIA, n), None),
+        "patient_age": ages,
+        "patient_age_group": _pick_age_group(ages),
+        "patient_sex": sexes,
+        "patient_weight_kg": rng.normal(75, 15, n).round(1),
+        "drug_name": drugs[:, 0],
+        "drug_generic_name": drugs[:, 1],
+        "drug_characterization": _choice(["Primary suspect", "Secondary suspect", "Concomitant"], n),
+        "drug_indication": drugs[:, 2],
+        "drug_route": drugs[:, 3],
+        "drug_dose": _choice([f"{dose}mg daily" for dose in (5, 10, 20, 25, 50, 100, 200, 500)], n),
+        "concomitant_drugs": _pick_concomitant_drugs(drug_idx),
+        "reaction_term": reactions,
+        "reaction_meddra_pt": reactions,
+        "reaction_outcome": outcomes,
+        "outcome_detail": np.where(is_serious, _choice(OUTCOME_DETAILS, n), None),
+        "narrative": [
+            f"Patient ({age}y {sex}) reported {_LOWER[reaction]} while taking {drug} for {_LOWER[indication]}."
+            for age, sex, reaction, drug, indication in zip(
+                ages.tolist(), sexes.tolist(), reactions.tolist(),
+                drugs[:, 0].tolist(), drugs[:, 2].tolist(),
+            )
+        ],
     }
 
 
 # ── Signal Generators ────────────────────────────────────
 
-def generate_signal_1_cardizol_cardiac(report_date: datetime) -> dict:
+def generate_signal_1_cardizol_cardiac(days_ago: np.ndarray) -> dict:
     """Signal 1: Cardizol-X → cardiac arrhythmia spike.
     
     Dramatically increased cardiac events in the last 90 days.
     """
-    age = random.randint(45, 85)
-    sex = random.choice(["Male", "Female"])
-    country_name, country_code = _pick_country()
+    n = len(days_ago)
+    ages = rng.integers(45, 86, n)
+    sexes = _choice(["Male", "Female"], n)
+    country_names, country_codes = _pick_country(n)
 
     cardiac_reactions = [
         "Cardiac arrhythmia", "Ventricular tachycardia",
         "QT prolongation", "Atrial fibrillation",
         "Cardiac arrest", "Tachycardia",
     ]
-    reaction = random.choice(cardiac_reactions)
-    outcome = random.choices(
-        OUTCOMES, weights=[0.15, 0.20, 0.25, 0.20, 0.20]
-    )[0]
+    reactions = _choice(cardiac_reactions, n)
+    outcomes = _choice(OUTCOMES, n, p=[0.15, 0.20, 0.25, 0.20, 0.20])
 
     return {
-        "report_id": f"FAERS-{uuid.uuid4().hex[:12].upper()}",
-        "report_date": report_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "receive_date": (report_date + timedelta(days=random.randint(1, 14))).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "reporter_type": random.choice(["Physician", "Pharmacist", "Nurse"]),
-        "reporter_country": country_name,
-        "reporter_country_code": country_code,
+        "report_id": _report_ids(n),
+        "report_date": _date_str(days_ago),
+        "receive_date": _date_str(days_ago - rng.integers(1, 15, n)),
+        "reporter_type": _choice(["Physician", "Pharmacist", "Nurse"], n),
+        "reporter_country": country_names,
+        "reporter_country_code": country_codes,
         "report_source": "Direct",
         "serious": True,
-        "seriousness_criteria": random.choice(["Life-threatening", "Hospitalization", "Death"]),
-        "patient_age": age,
-        "patient_age_group": _pick_age_group(age),
-        "patient_sex": sex,
-        "patient_weight_kg": round(random.gauss(80, 18), 1),
+        "seriousness_criteria": _choice(["Life-threatening", "Hospitalization", "Death"], n),
+        "patient_age": ages,
+        "patient_age_group": _pick_age_group(ages),
+        "patient_sex": sexes,
+        "patient_weight_kg": rng.normal(80, 18, n).round(1),
         "drug_name": "Cardizol-X",
         "drug_generic_name": "cardizolam",
         "drug_characterization": "Primary suspect",
         "drug_indication": "Hypertension",
         "drug_route": "Oral",
-        "drug_dose": f"{random.choice([50, 100, 200])}mg daily",
-        "concomitant_drugs": _pick_concomitant_drugs("Cardizol-X"),
-        "reaction_term": reaction,
-        "reaction_meddra_pt": reaction,
-        "reaction_outcome": outcome,
-        "outcome_detail": random.choice(["Hospitalization", "Life-threatening", "Required intervention"]),
-        "narrative": f"Patient ({age}y {sex}) developed {reaction.lower()} after starting Cardizol-X for hypertension. ECG confirmed {reaction.lower()}.",
+        "drug_dose": _choice(["50mg daily", "100mg daily", "200mg daily"], n),
+        "concomitant_drugs": _pick_concomitant_drugs(np.full(n, DRUG_INDEX["Cardizol-X"])),
+        "reaction_term": reactions,
+        "reaction_meddra_pt": reactions,
+        "reaction_outcome": outcomes,
+        "outcome_detail": _choice(["Hospitalization", "Life-threatening", "Required intervention"], n),
+        "narrative": [
+            f"Patient ({age}y {sex}) developed {_LOWER[reaction]} after starting Cardizol-X for hypertension. ECG confirmed {_LOWER[reaction]}."
+            for age, sex, reaction in zip(ages.tolist(), sexes.tolist(), reactions.tolist())
+        ],
     }
 
 
-def generate_signal_2_neurofen_hepato(report_date: datetime) -> dict:
+def generate_signal_2_neurofen_hepato(days_ago: np.ndarray) -> dict:
     """Signal 2: Neurofen-Plus → hepatotoxicity in elderly females."""
-    age = random.randint(60, 88)
-    sex = random.choices(["Female", "Male"], weights=[0.78, 0.22])[0]
-    country_name, country_code = _pick_country()
+    n = len(days_ago)
+    ages = rng.integers(60, 89, n)
+    sexes = _choice(["Female", "Male"], n, p=[0.78, 0.22])
+    country_names, country_codes = _pick_country(n)
 
     hepato_reactions = [
         "Hepatotoxicity", "Liver injury", "Hepatic failure",
         "Jaundice", "Hepatitis", "Transaminases increased",
     ]
-    reaction = random.choice(hepato_reactions)
+    reactions = _choice(hepato_reactions, n)
 
     return {
-        "report_id": f"FAERS-{uuid.uuid4().hex[:12].upper()}",
-        "report_date": report_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "receive_date": (report_date + timedelta(days=random.randint(1, 21))).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "reporter_type": random.choice(["Physician", "Pharmacist"]),
-        "reporter_country": country_name,
-        "reporter_country_code": country_code,
+        "report_id": _report_ids(n),
+        "report_date": _date_str(days_ago),
+        "receive_date": _date_str(days_ago - rng.integers(1, 22, n)),
+        "reporter_type": _choice(["Physician", "Pharmacist"], n),
+        "reporter_country": country_names,
+        "reporter_country_code": country_codes,
         "report_source": "Direct",
         "serious": True,
-        "seriousness_criteria": random.choice(["Hospitalization", "Life-threatening"]),
-        "patient_age": age,
+        "seriousness_criteria": _choice(["Hospitalization", "Life-threatening"], n),
+        "patient_age": ages,
         "patient_age_group": "Elderly",
-        "patient_sex": sex,
-        "patient_weight_kg": round(random.gauss(68, 12), 1),
+        "patient_sex": sexes,
+        "patient_weight_kg": rng.normal(68, 12, n).round(1),
         "drug_name": "Neurofen-Plus",
         "drug_generic_name": "ibuprofen-codeine",
         "drug_characterization": "Primary suspect",
         "drug_indication": "Pain Management",
         "drug_route": "Oral",
-        "drug_dose": f"{random.choice([200, 400])}mg/12.8mg twice daily",
-        "concomitant_drugs": _pick_concomitant_drugs("Neurofen-Plus"),
-        "reaction_term": reaction,
-        "reaction_meddra_pt": reaction,
-        "reaction_outcome": random.choices(OUTCOMES, weights=[0.20, 0.25, 0.30, 0.10, 0.15])[0],
+        "drug_dose": _choice(["200mg/12.8mg twice daily", "400mg/12.8mg twice daily"], n),
+        "concomitant_drugs": _pick_concomitant_drugs(np.full(n, DRUG_INDEX["Neurofen-Plus"])),
+        "reaction_term": reactions,
+        "reaction_meddra_pt": reactions,
+        "reaction_outcome": _choice(OUTCOMES, n, p=[0.20, 0.25, 0.30, 0.10, 0.15]),
         "outcome_detail": "Hospitalization",
-        "narrative": f"Elderly {sex.lower()} patient ({age}y) developed {reaction.lower()} after prolonged use of Neurofen-Plus. LFTs significantly elevated.",
+        "narrative": [
+            f"Elderly {_LOWER[sex]} patient ({age}y) developed {_LOWER[reaction]} after prolonged use of Neurofen-Plus. LFTs significantly elevated."
+            for age, sex, reaction in zip(ages.tolist(), sexes.tolist(), reactions.tolist())
+        ],
     }
 
 
-def generate_signal_3_arthrex_rhabdo(report_date: datetime) -> dict:
+def generate_signal_3_arthrex_rhabdo(days_ago: np.ndarray) -> dict:
     """Signal 3: Arthrex-200 → rhabdomyolysis with statin co-prescription."""
-    age = random.randint(50, 80)
-    sex = random.choice(["Male", "Female"])
-    country_name, country_code = _pick_country()
+    n = len(days_ago)
+    ages = rng.integers(50, 81, n)
+    sexes = _choice(["Male", "Female"], n)
+    country_names, country_codes = _pick_country(n)
 
     rhabdo_reactions = [
         "Rhabdomyolysis", "Myopathy", "Creatine kinase increased",
     ]
-    reaction = random.choice(rhabdo_reactions)
+    reactions = _choice(rhabdo_reactions, n)
 
     # Always co-prescribed with a statin
-    statin = random.choice(["Lipitorex", "Simvalex"])
-    other_concomitant = _pick_concomitant_drugs("Arthrex-200", count=random.randint(0, 2))
-    concomitant = [statin] + [d for d in other_concomitant if d not in [statin]]
+    statins = _choice(["Lipitorex", "Simvalex"], n).tolist()
+    other_concomitant = _pick_concomitant_drugs(
+        np.full(n, DRUG_INDEX["Arthrex-200"]), counts=rng.integers(0, 3, n)
+    )
+    concomitant = [
+        [statin] + [d for d in others if d != statin]
+        for statin, others in zip(statins, other_concomitant)
+    ]
 
     return {
-        "report_id": f"FAERS-{uuid.uuid4().hex[:12].upper()}",
-        "report_date": report_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "receive_date": (report_date + timedelta(days=random.randint(1, 14))).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "reporter_type": random.choice(["Physician", "Pharmacist"]),
-        "reporter_country": country_name,
-        "reporter_country_code": country_code,
+        "report_id": _report_ids(n),
+        "report_date": _date_str(days_ago),
+        "receive_date": _date_str(days_ago - rng.integers(1, 15, n)),
+        "reporter_type": _choice(["Physician", "Pharmacist"], n),
+        "reporter_country": country_names,
+        "reporter_country_code": country_codes,
         "report_source": "Direct",
         "serious": True,
-        "seriousness_criteria": random.choice(["Hospitalization", "Life-threatening"]),
-        "patient_age": age,
-        "patient_age_group": _pick_age_group(age),
-        "patient_sex": sex,
-        "patient_weight_kg": round(random.gauss(82, 15), 1),
+        "seriousness_criteria": _choice(["Hospitalization", "Life-threatening"], n),
+        "patient_age": ages,
+        "patient_age_group": _pick_age_group(ages),
+        "patient_sex": sexes,
+        "patient_weight_kg": rng.normal(82, 15, n).round(1),
         "drug_name": "Arthrex-200",
         "drug_generic_name": "celecoxib-200",
         "drug_characterization": "Primary suspect",
@@ -311,84 +393,125 @@ def generate_signal_3_arthrex_rhabdo(report_date: datetime) -> dict:
         "drug_route": "Oral",
         "drug_dose": "200mg daily",
         "concomitant_drugs": concomitant,
-        "reaction_term": reaction,
-        "reaction_meddra_pt": reaction,
-        "reaction_outcome": random.choices(OUTCOMES, weights=[0.15, 0.30, 0.30, 0.10, 0.15])[0],
+        "reaction_term": reactions,
+        "reaction_meddra_pt": reactions,
+        "reaction_outcome": _choice(OUTCOMES, n, p=[0.15, 0.30, 0.30, 0.10, 0.15]),
         "outcome_detail": "Hospitalization",
-        "narrative": f"Patient ({age}y {sex}) on Arthrex-200 + {statin} developed {reaction.lower()}. CK levels markedly elevated. Possible drug interaction.",
+        "narrative": [
+            f"Patient ({age}y {sex}) on Arthrex-200 + {statin} developed {_LOWER[reaction]}. CK levels markedly elevated. Possible drug interaction."
+            for age, sex, statin, reaction in zip(ages.tolist(), sexes.tolist(), statins, reactions.tolist())
+        ],
     }
 
 
 # ── Main Generation Logic ────────────────────────────────
 
-def generate_all_reports(total_count: int) -> list[dict]:
-    """Generate all FAERS reports with embedded signals.
+# Reports are generated this many at a time, so memory stays flat however
+# large --count is
+GENERATION_CHUNK_SIZE = 10_000
+
+
+def iter_all_reports(total_count: int) -> Iterator[dict]:
+    """Lazily yield all FAERS reports with embedded signals, in shuffled order.
     
     Distribution over 2 years:
     - Baseline: ~90% of reports (normal adverse events across all drugs)
     - Signal 1 (Cardizol-X cardiac): Low baseline + spike in last 90 days
     - Signal 2 (Neurofen-Plus hepato): Gradual increase over last 6 months
     - Signal 3 (Arthrex-200 rhabdo): Consistent but detectable with statin co-use
-    """
-    reports = []
-    now = datetime(2026, 2, 1)
-    start_date = now - timedelta(days=730)  # 2 years back
 
+    The kind and date of every report are decided up front and shuffled as
+    two integer arrays; report dicts are then built one chunk at a time.
+    """
     # ── Baseline reports ──────────────────────────────
     baseline_count = int(total_count * 0.88)
     logger.info(f"Generating {baseline_count:,} baseline reports...")
-    for _ in tqdm(range(baseline_count), desc="Baseline"):
-        days_ago = random.randint(0, 730)
-        report_date = now - timedelta(days=days_ago)
-        reports.append(generate_baseline_report(report_date))
 
     # ── Signal 1: Cardizol-X cardiac spike ────────────
     # Low baseline (2% of Cardizol reports are cardiac) for months 1-21
     # Then 4x spike in last 90 days
     signal_1_baseline = int(total_count * 0.02)
     signal_1_spike = int(total_count * 0.04)
-
     logger.info(f"Generating Signal 1: {signal_1_baseline:,} baseline + {signal_1_spike:,} spike cardiac events...")
-    for _ in tqdm(range(signal_1_baseline), desc="Signal 1 baseline"):
-        days_ago = random.randint(90, 730)
-        report_date = now - timedelta(days=days_ago)
-        reports.append(generate_signal_1_cardizol_cardiac(report_date))
-
-    for _ in tqdm(range(signal_1_spike), desc="Signal 1 spike"):
-        days_ago = random.randint(0, 89)
-        report_date = now - timedelta(days=days_ago)
-        reports.append(generate_signal_1_cardizol_cardiac(report_date))
 
     # ── Signal 2: Neurofen-Plus hepato (gradual rise) ─
     signal_2_count = int(total_count * 0.03)
     logger.info(f"Generating Signal 2: {signal_2_count:,} hepatotoxicity events (gradual rise)...")
-    for _ in tqdm(range(signal_2_count), desc="Signal 2"):
-        # Weight towards recent dates (more reports in recent months)
-        days_ago = int(abs(random.gauss(0, 90)))
-        days_ago = min(days_ago, 365)
-        report_date = now - timedelta(days=days_ago)
-        reports.append(generate_signal_2_neurofen_hepato(report_date))
 
     # ── Signal 3: Arthrex-200 rhabdo (statin interaction) ─
     signal_3_count = int(total_count * 0.03)
     logger.info(f"Generating Signal 3: {signal_3_count:,} rhabdomyolysis events...")
-    for _ in tqdm(range(signal_3_count), desc="Signal 3"):
-        days_ago = random.randint(0, 365)
-        report_date = now - timedelta(days=days_ago)
-        reports.append(generate_signal_3_arthrex_rhabdo(report_date))
 
-    random.shuffle(reports)
-    logger.info(f"Total reports generated: {len(reports):,}")
-    return reports
+    # Generator and days-ago sample per report kind
+    generators = [
+        generate_baseline_reports,
+        generate_signal_1_cardizol_cardiac,
+        generate_signal_1_cardizol_cardiac,
+        generate_signal_2_neurofen_hepato,
+        generate_signal_3_arthrex_rhabdo,
+    ]
+    days_ago = [
+        rng.integers(0, 731, baseline_count),
+        rng.integers(90, 731, signal_1_baseline),
+        rng.integers(0, 90, signal_1_spike),
+        # Weight towards recent dates (more reports in recent months)
+        np.minimum(np.abs(rng.normal(0, 90, signal_2_count)).astype(int), 365),
+        rng.integers(0, 366, signal_3_count),
+    ]
+    kinds = np.repeat(np.arange(len(generators)), [len(d) for d in days_ago])
+    days_ago = np.concatenate(days_ago)
+    order = rng.permutation(len(kinds))
+    kinds, days_ago = kinds[order], days_ago[order]
+
+    with tqdm(total=len(kinds), desc="Reports") as progress:
+        for start in range(0, len(kinds), GENERATION_CHUNK_SIZE):
+            chunk_kinds = kinds[start:start + GENERATION_CHUNK_SIZE]
+            chunk_days = days_ago[start:start + GENERATION_CHUNK_SIZE]
+            rows = {
+                kind: iter(_rows(generators[kind](chunk_days[chunk_kinds == kind])))
+                for kind in np.unique(chunk_kinds).tolist()
+            }
+            for kind in chunk_kinds.tolist():
+                yield next(rows[kind])
+            progress.update(len(chunk_kinds))
+
+    logger.info(f"Total reports generated: {len(kinds):,}")
+
+
+def generate_all_reports(total_count: int) -> list[dict]:
+    """Generate all FAERS reports as a list (see iter_all_reports)."""
+    return list(iter_all_reports(total_count))
 
 
 # ── Elasticsearch Ingestion ──────────────────────────────
 
+class OrjsonSerializer(JsonSerializer):
+    """JSON serializer backed by orjson.
+
+    Bulk bodies are encoded by _ndjson_chunks, but every bulk response
+    (one item per indexed document) still comes back through loads().
+    """
+
+    def dumps(self, data) -> bytes:
+        if isinstance(data, str):
+            return data.encode("utf-8", "surrogatepass")
+        if isinstance(data, bytes):
+            return data
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+@lru_cache(maxsize=1)
+def _load_mappings() -> dict:
+    """Index definitions from index_mappings.json, read once per process."""
+    return orjson.loads((Path(__file__).parent / "index_mappings.json").read_bytes())
+
+
 def create_index(es: Elasticsearch, index_name: str = "faers_reports"):
     """Create the FAERS index with proper mappings."""
-    mappings_path = Path(__file__).parent / "index_mappings.json"
-    with open(mappings_path) as f:
-        mappings = json.load(f)
+    mappings = _load_mappings()
 
     if es.indices.exists(index=index_name):
         logger.info(f"Deleting existing index: {index_name}")
@@ -401,25 +524,82 @@ def create_index(es: Elasticsearch, index_name: str = "faers_reports"):
     )
 
 
-def bulk_ingest(es: Elasticsearch, reports: list[dict], index_name: str = "faers_reports"):
-    """Bulk index reports into Elasticsearch."""
-    def _actions():
-        for report in reports:
-            yield {
-                "_index": index_name,
-                "_id": report["report_id"],
-                "_source": report,
-            }
+def _set_refresh_interval(es: Elasticsearch, index_name: str, interval):
+    """Set index.refresh_interval (None resets it), tolerating clusters that
+    manage refreshes themselves."""
+    try:
+        es.indices.put_settings(index=index_name, settings={"index": {"refresh_interval": interval}})
+    except Exception as e:
+        logger.warning(f"Could not set refresh_interval={interval} on {index_name}: {e}")
 
-    logger.info(f"Bulk indexing {len(reports):,} reports into {index_name}...")
-    success, errors = helpers.bulk(
-        es,
-        _actions(),
-        chunk_size=2000,
-        request_timeout=120,
-        raise_on_error=False,
-    )
-    logger.info(f"Indexed: {success:,} | Errors: {len(errors) if isinstance(errors, list) else errors}")
+
+# Bulk request shape: documents per request, and requests in flight at once
+BULK_CHUNK_SIZE = 2000
+BULK_THREADS = 8
+
+
+def _ndjson_chunks(reports: Iterable[dict], index_name: str, chunk_size: int) -> Iterator[bytes]:
+    """Encode reports into ready-to-send bulk API bodies of chunk_size documents.
+
+    Report IDs are plain hex, so the action line is spliced together from
+    bytes instead of being serialized per document.
+    """
+    action_prefix = b'{"index":{"_index":' + orjson.dumps(index_name) + b',"_id":"'
+    buf = bytearray()
+    n = 0
+    for report in reports:
+        buf += action_prefix
+        buf += report["report_id"].encode()
+        buf += b'"}}\n'
+        buf += orjson.dumps(report)
+        buf += b"\n"
+        n += 1
+        if n == chunk_size:
+            yield bytes(buf)
+            buf.clear()
+            n = 0
+    if buf:
+        yield bytes(buf)
+
+
+def _send_bulk(es: Elasticsearch, body: bytes) -> tuple[int, int]:
+    """POST one NDJSON bulk body; returns (indexed, failed) item counts."""
+    resp = es.options(request_timeout=120).bulk(operations=[body])
+    items = resp["items"]
+    if not resp["errors"]:
+        return len(items), 0
+    failed = sum(1 for item in items if "error" in item["index"])
+    return len(items) - failed, failed
+
+
+def bulk_ingest(es: Elasticsearch, reports: Iterable[dict], index_name: str = "faers_reports"):
+    """Bulk index reports into Elasticsearch.
+
+    `reports` is consumed lazily, so generation overlaps with indexing and
+    the full dataset is never held in memory: at most 2 * BULK_THREADS
+    encoded bodies are queued or in flight at a time.
+    """
+    logger.info(f"Bulk indexing reports into {index_name}...")
+    # No periodic refreshes while loading; the single refresh below makes
+    # everything searchable at once
+    _set_refresh_interval(es, index_name, "-1")
+    success, errors = 0, 0
+    try:
+        with ThreadPoolExecutor(max_workers=BULK_THREADS) as pool:
+            pending = deque()
+            for body in _ndjson_chunks(reports, index_name, BULK_CHUNK_SIZE):
+                pending.append(pool.submit(_send_bulk, es, body))
+                if len(pending) >= 2 * BULK_THREADS:
+                    ok, failed = pending.popleft().result()
+                    success += ok
+                    errors += failed
+            for future in pending:
+                ok, failed = future.result()
+                success += ok
+                errors += failed
+    finally:
+        _set_refresh_interval(es, index_name, None)  # Back to the cluster default
+    logger.info(f"Indexed: {success:,} | Errors: {errors:,}")
 
     es.indices.refresh(index=index_name)
     count = es.count(index=index_name)
@@ -440,18 +620,16 @@ def main():
         args.es_url,
         api_key=args.api_key,
         request_timeout=60,
+        serializers={"application/json": OrjsonSerializer()},
     )
 
     # Verify connection
     info = es.info()
     logger.info(f"Connected to Elasticsearch: {info['version']['number']}")
 
-    # Generate data
-    reports = generate_all_reports(args.count)
-
-    # Create index and ingest
+    # Create index, then generate and ingest in one streaming pass
     create_index(es, args.index)
-    bulk_ingest(es, reports, args.index)
+    bulk_ingest(es, iter_all_reports(args.count), args.index)
 
     logger.info("Data generation complete!")
     logger.info("Embedded signals:")
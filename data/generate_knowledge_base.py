@@ -15,14 +15,20 @@ embeddings at index time using ELSER v2.
 
 import json
 import argparse
+import hashlib
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, helpers
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
 
+# RAG prompts only use the head of each document; storing it separately lets
+# the app fetch this prefix instead of pulling full documents over the wire
+CONTENT_PREVIEW_CHARS = 2000
+
 
 # ── Knowledge Documents ──────────────────────────────────
 
@@ -380,44 +386,53 @@ Minimum criteria for a valid ICSR:
     },
 ]
 
+# Contents are written as indented triple-quoted blocks; trim them once here
+for _doc in KNOWLEDGE_DOCS:
+    _doc["content"] = _doc["content"].strip()
+
 
 # ── Elasticsearch Index Setup with Semantic Search ───────
 
+# Preconfigured ELSER endpoint: adaptive allocations that scale with the
+# ingest burst and down to zero when idle
+ELSER_ENDPOINT_ID = ".elser-2-elasticsearch"
+
+
 def setup_inference_endpoint(es: Elasticsearch):
-    """Set up ELSER v2 inference endpoint for semantic embeddings."""
-    endpoint_id = "elser-v2-pharma"
-    
+    """Resolve the ELSER v2 inference endpoint for semantic embeddings."""
     try:
-        # Check if endpoint already exists
-        existing = es.inference.get(inference_id=endpoint_id)
-        logger.info(f"Inference endpoint '{endpoint_id}' already exists.")
-        return endpoint_id
-    except Exception:
-        pass
-    
-    try:
-        logger.info(f"Creating ELSER v2 inference endpoint: {endpoint_id}")
-        es.inference.put(
-            inference_id=endpoint_id,
-            task_type="sparse_embedding",
-            body={
-                "service": "elser",
-                "service_settings": {
-                    "num_allocations": 1,
-                    "num_threads": 1,
-                }
-            },
-        )
-        logger.info(f"Inference endpoint '{endpoint_id}' created successfully!")
-        return endpoint_id
+        es.inference.get(inference_id=ELSER_ENDPOINT_ID)
+        logger.info(f"Using inference endpoint '{ELSER_ENDPOINT_ID}'")
+        return ELSER_ENDPOINT_ID
     except Exception as e:
-        logger.warning(f"Could not create ELSER endpoint: {e}")
+        logger.warning(f"ELSER endpoint '{ELSER_ENDPOINT_ID}' not available: {e}")
         logger.info("Falling back to standard text search (no embeddings)")
         return None
 
 
-def create_knowledge_index(es: Elasticsearch, index_name: str, inference_endpoint: str = None):
-    """Create index with semantic_text field for automatic embedding generation."""
+def _content_hash(mapping: dict) -> str:
+    """Digest of the index definition plus every document it will hold."""
+    payload = {"mapping": mapping, "docs": KNOWLEDGE_DOCS, "preview_chars": CONTENT_PREVIEW_CHARS}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _live_mappings(es: Elasticsearch, index_name: str) -> Optional[dict]:
+    """Current mappings of the index, or None if it does not exist (one round-trip)."""
+    resp = es.options(ignore_status=404).indices.get_mapping(index=index_name)
+    if resp.meta.status == 404:
+        return None
+    return resp[index_name]["mappings"]
+
+
+def create_knowledge_index(
+    es: Elasticsearch, index_name: str, inference_endpoint: str = None, force: bool = False
+) -> Optional[str]:
+    """Create index with semantic_text field for automatic embedding generation.
+
+    Returns the content hash to record once ingest succeeds, or None when the
+    existing index already holds exactly this mapping and corpus (re-creating
+    it would only re-run ELSER over unchanged documents).
+    """
     
     if inference_endpoint:
         # Use semantic_text for auto-embedding via ELSER
@@ -439,6 +454,7 @@ def create_knowledge_index(es: Elasticsearch, index_name: str, inference_endpoin
                         "type": "semantic_text",
                         "inference_id": inference_endpoint,
                     },
+                    "content_preview": {"type": "text", "index": False},
                     "indexed_at": {"type": "date"},
                 }
             }
@@ -468,43 +484,70 @@ def create_knowledge_index(es: Elasticsearch, index_name: str, inference_endpoin
                     "category": {"type": "keyword"},
                     "drug_name": {"type": "keyword"},
                     "content": {"type": "text", "analyzer": "pharma_analyzer"},
+                    "content_preview": {"type": "text", "index": False},
                     "indexed_at": {"type": "date"},
                 }
             }
         }
 
-    if es.indices.exists(index=index_name):
+    content_hash = _content_hash(mapping)
+    live = _live_mappings(es, index_name)
+    # content_hash is recorded in _meta by the last complete ingest
+    if not force and live is not None and live.get("_meta", {}).get("content_hash") == content_hash:
+        logger.info(f"Index '{index_name}' is up to date, nothing to re-index")
+        return None
+
+    if live is not None:
         logger.info(f"Deleting existing index: {index_name}")
         es.indices.delete(index=index_name)
 
     logger.info(f"Creating knowledge index: {index_name}")
     es.indices.create(index=index_name, body=mapping)
     logger.info(f"Index '{index_name}' created with {'semantic_text (ELSER v2)' if inference_endpoint else 'BM25 full-text search'}")
+    return content_hash
+
+
+def ingest_knowledge(es: Elasticsearch, index_name: str) -> int:
+    """Index all knowledge documents in one bulk request; returns the error count.
+
+    semantic_text fields are embedded server-side while the bulk request is
+    processed, so the timeout is generous; a single refresh afterwards makes
+    every document searchable.
+    """
+    indexed_at = datetime.now(timezone.utc).isoformat()
+
+    def _actions():
+        for doc in KNOWLEDGE_DOCS:
+            content = doc["content"]
+            yield {
+                "_index": index_name,
+                "_id": doc["doc_id"],
+                "_source": {
+                    "doc_id": doc["doc_id"],
+                    "title": doc["title"],
+                    "category": doc["category"],
+                    "drug_name": doc["drug_name"],
+                    "content": content,
+                    "content_preview": content[:CONTENT_PREVIEW_CHARS],
+                    "indexed_at": indexed_at,
+                },
+            }
 
-
-def ingest_knowledge(es: Elasticsearch, index_name: str):
-    """Index all knowledge documents one by one (semantic_text needs time to embed)."""
-    total = len(KNOWLEDGE_DOCS)
-    
-    for i, doc in enumerate(KNOWLEDGE_DOCS, 1):
-        logger.info(f"  Indexing [{i}/{total}]: {doc['title'][:60]}...")
-        es.index(
-            index=index_name,
-            id=doc["doc_id"],
-            document={
-                "doc_id": doc["doc_id"],
-                "title": doc["title"],
-                "category": doc["category"],
-                "drug_name": doc["drug_name"],
-                "content": doc["content"].strip(),
-                "indexed_at": datetime.utcnow().isoformat(),
-            },
-            refresh="wait_for",  # Wait for indexing to complete
-        )
+    success, errors = helpers.bulk(
+        es.options(request_timeout=300),
+        _actions(),
+        chunk_size=500,
+        max_chunk_bytes=10 * 1024 * 1024,
+        raise_on_error=False,
+    )
+    logger.info(f"Indexed: {success} | Errors: {len(errors)}")
+    for error in errors:
+        logger.error(f"  Failed: {error}")
 
     es.indices.refresh(index=index_name)
     count = es.count(index=index_name)
     logger.info(f"Total documents in {index_name}: {count['count']}")
+    return len(errors)
 
 
 def main():
@@ -513,6 +556,7 @@ def main():
     parser.add_argument("--api-key", required=True, help="Elasticsearch API key")
     parser.add_argument("--index", default="pharma_knowledge", help="Index name")
     parser.add_argument("--skip-elser", action="store_true", help="Skip ELSER setup, use BM25 only")
+    parser.add_argument("--force", action="store_true", help="Rebuild the index even if it is up to date")
     args = parser.parse_args()
 
     es = Elasticsearch(args.es_url, api_key=args.api_key, request_timeout=120)
@@ -524,12 +568,16 @@ def main():
     if not args.skip_elser:
         inference_endpoint = setup_inference_endpoint(es)
     
-    # Step 2: Create index with appropriate mappings
-    create_knowledge_index(es, args.index, inference_endpoint)
+    # Step 2: Create index with appropriate mappings (skipped when unchanged)
+    content_hash = create_knowledge_index(es, args.index, inference_endpoint, force=args.force)
+    if content_hash is None:
+        return
     
     # Step 3: Index documents
     logger.info(f"Indexing {len(KNOWLEDGE_DOCS)} knowledge documents...")
-    ingest_knowledge(es, args.index)
+    if ingest_knowledge(es, args.index) == 0:
+        # Only a complete ingest marks the index as up to date
+        es.indices.put_mapping(index=args.index, meta={"content_hash": content_hash})
 
     logger.info("\n" + "=" * 60)
     logger.info("Knowledge base generation complete!")
@@ -537,6 +585,7 @@ def main():
     logger.info(f"  Index: {args.index}")
     logger.info(f"  Embedding: {'ELSER v2 (semantic)' if inference_endpoint else 'BM25 (full-text)'}")
     logger.info(f"  Categories: drug_label, methodology, regulatory")
+    logger.info("  A running API caches answers for 15 min; POST /api/knowledge/cache/clear to refresh")
     logger.info("=" * 60)
 
 
@@ -7,9 +7,12 @@ Usage:
     python -m data.preview_data --count 200  # custom count
 """
 
-import json
 import argparse
+from collections import Counter
 from pathlib import Path
+
+import orjson
+
 from data.generate_faers_data import generate_all_reports
 
 def main():
@@ -24,26 +27,22 @@ def main():
     # Save to file
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(reports, f, indent=2, default=str)
+    output_path.write_bytes(orjson.dumps(reports, option=orjson.OPT_INDENT_2))
 
     print(f"\nSaved {len(reports)} reports to {output_path}")
     print(f"File size: {output_path.stat().st_size / 1024:.1f} KB")
 
     # Show summary
-    drugs = {}
-    for r in reports:
-        d = r.get("drug_name", "Unknown")
-        drugs[d] = drugs.get(d, 0) + 1
+    drugs = Counter(r.get("drug_name", "Unknown") for r in reports)
 
     print(f"\nDrug distribution:")
-    for drug, count in sorted(drugs.items(), key=lambda x: -x[1]):
+    for drug, count in drugs.most_common():
         print(f"  {drug}: {count} reports")
 
     # Show first 3 records as preview
     print(f"\n--- Sample Records (first 3) ---\n")
     for i, report in enumerate(reports[:3]):
-        print(json.dumps(report, indent=2, default=str))
+        print(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode())
         if i < 2:
             print()
 
@@ -261,7 +261,7 @@ function ReportCard({ rpt, index }) {
                     <span className="chat-report-drug">{rpt.drug_name}</span>
                     <span className={`badge ${getPriorityClass(rpt.risk_level)}`}>{rpt.risk_level}</span>
                 </div>
-                <div className="chat-report-subtitle">{rpt.reaction_term}</div>
+                <div className="chat-report-subtitle">{rpt.reaction_terms?.join(', ') || rpt.reaction_term}</div>
                 <FiChevronDown className={`chat-report-chevron ${open ? 'rotated' : ''}`} />
             </button>
             {open && rpt.report_markdown && (
@@ -454,9 +454,7 @@ export default function Dashboard() {
             const id = currentMsgIdRef.current;
             setMessages(prev => prev.map(m => {
                 if (m.id !== id) return m;
-                const exists = (m.reasoningSteps || []).some(
-                    p => p.content === next.content && p.timestamp === next.timestamp
-                );
+                const exists = (m.reasoningSteps || []).some(p => p.id === next.id);
                 if (exists) return m;
                 return { ...m, reasoningSteps: [...(m.reasoningSteps || []), next] };
             }));
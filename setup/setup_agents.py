@@ -7,12 +7,14 @@ Usage:
     python -m setup.setup_agents --kibana-url <URL> --api-key <KEY>
 """
 
-import json
+import asyncio
 import argparse
 import logging
 from pathlib import Path
+from typing import Optional
 
 import httpx
+import orjson
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -21,171 +23,214 @@ CONFIG_DIR = Path(__file__).parent.parent / "agent_config"
 
 
 def load_json(filename: str) -> dict:
-    path = CONFIG_DIR / filename
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
-
-
-def register_tools(client: httpx.Client, tools: list[dict]):
-    """Register ES|QL tools via Kibana API."""
-    for tool in tools:
-        tool_id = tool["toolId"]
-        logger.info(f"Registering tool: {tool_id}")
-
-        # Transform parameters list to the object format the API expects
-        params_obj = {}
-        for p in tool.get("parameters", []):
-            param_def = {
-                "type": p["type"],
-                "description": p.get("description", ""),
-                "optional": not p.get("required", True)
-            }
-            if "defaultValue" in p:
-                param_def["defaultValue"] = p["defaultValue"]
-            params_obj[p["name"]] = param_def
-
-        payload = {
-            "id": tool_id,
-            "type": "esql",
-            "description": tool["description"],
-            "configuration": {
-                "query": tool["query"],
-                "params": params_obj
-            }
-        }
-
-        # Delete first to ensure a clean update (idempotent setup)
-        client.delete(f"/api/agent_builder/tools/{tool_id}")
-        
-        # Create
-        resp = client.post("/api/agent_builder/tools", json=payload)
-
-        if resp.status_code in (200, 201):
-            logger.info(f"  ✓ Tool {tool_id} registered successfully")
-        else:
-            logger.error(f"  ✗ Failed to register {tool_id}: {resp.status_code} {resp.text}")
-
-
-def register_agents(client: httpx.Client, agents: list[dict]):
-    """Register custom agents via Kibana API."""
-    for agent in agents:
-        agent_id = agent["agentId"]
-        logger.info(f"Registering agent: {agent_id}")
-
-        configuration = {
-                "instructions": agent["instructions"],
-            }
-        
-        # Include tools — empty array for agents with no tools (API requires the field)
-        if agent.get("tools"):
-            configuration["tools"] = [
-                { "tool_ids": agent["tools"] }
-            ]
+    return orjson.loads((CONFIG_DIR / filename).read_bytes())
+
+
+# Kibana sheds bursts with these; each is retried after an exponential backoff
+RETRY_STATUSES = {429, 502, 503}
+MAX_ATTEMPTS = 4
+
+# Cap on in-flight registration requests: enough overlap to hide round-trips
+# without provoking the 429/503s a full fan-out would
+_request_slots = asyncio.Semaphore(5)
+
+
+async def _request(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """client.request, retrying rate-limited / unavailable responses so one
+    throttled entity does not stall the whole registration batch."""
+    for attempt in range(MAX_ATTEMPTS):
+        async with _request_slots:
+            resp = await client.request(method, url, **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS - 1:
+            return resp
+        retry_after = resp.headers.get("retry-after", "")
+        delay = float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+        logger.warning(f"  {method} {url} -> {resp.status_code}, retry {attempt + 1}/{MAX_ATTEMPTS - 1} in {delay}s")
+        await asyncio.sleep(delay)
+
+
+async def _upsert(
+    client: httpx.AsyncClient,
+    collection: str,
+    entity_id: str,
+    payload: dict,
+    immutable: tuple,
+    current: Optional[dict],
+) -> Optional[httpx.Response]:
+    """Idempotent setup: update the entity in place, creating it only if missing.
+
+    `current` is the entity as already registered (None if absent); when it
+    matches the payload field for field nothing is sent and None is returned.
+    Otherwise re-runs cost one request per entity instead of a delete plus a
+    create; fields the update endpoint does not accept are left out of the
+    PUT body.
+    """
+    update = {k: v for k, v in payload.items() if k not in immutable}
+    if current and all(current.get(k) == v for k, v in update.items()):
+        return None
+    resp = await _request(client, "PUT", f"/api/agent_builder/{collection}/{entity_id}", json=update)
+    if resp.status_code == 404:
+        resp = await _request(client, "POST", f"/api/agent_builder/{collection}", json=payload)
+    return resp
+
+
+def _registered(listing, key: str) -> dict:
+    """{id: definition} from a list-endpoint response: a bare list, or an object
+    holding it under `key` or "results", of dicts or bare ID strings."""
+    if isinstance(listing, dict):
+        listing = listing.get(key) or listing.get("results", [])
+    registered = {}
+    for item in listing:
+        if isinstance(item, dict):
+            registered[item.get("id") or item.get("toolId") or item.get("agentId")] = item
         else:
-            configuration["tools"] = []
-
-        payload = {
-            "id": agent_id,
-            "name": agent["displayName"],
-            "description": agent["displayDescription"],
-            "avatar_color": agent.get("avatarColor", "#4ECDC4"),
-            "avatar_symbol": agent.get("avatarSymbol", "🤖"),
-            "configuration": configuration,
+            registered[item] = {}
+    return registered
+
+
+async def _list(client: httpx.AsyncClient, collection: str) -> dict:
+    """Currently registered tools or agents as {id: definition}; empty if unavailable."""
+    resp = await _request(client, "GET", f"/api/agent_builder/{collection}")
+    if resp.status_code != 200:
+        logger.warning(f"  Could not list {collection}: {resp.status_code} {resp.text[:200]}")
+        return {}
+    return _registered(resp.json(), collection)
+
+
+async def register_tool(client: httpx.AsyncClient, tool: dict, current: Optional[dict] = None):
+    """Register one ES|QL tool via Kibana API."""
+    tool_id = tool["toolId"]
+    logger.info(f"Registering tool: {tool_id}")
+
+    # Transform parameters list to the object format the API expects
+    params_obj = {
+        p["name"]: {
+            "type": p["type"],
+            "description": p.get("description", ""),
+            "optional": not p.get("required", True),
+            **({"defaultValue": p["defaultValue"]} if "defaultValue" in p else {}),
         }
+        for p in tool.get("parameters", [])
+    }
+
+    payload = {
+        "id": tool_id,
+        "type": "esql",
+        "description": tool["description"],
+        "configuration": {
+            "query": tool["query"],
+            "params": params_obj
+        }
+    }
 
-        if "labels" in agent:
-            payload["labels"] = agent["labels"]
+    resp = await _upsert(client, "tools", tool_id, payload, immutable=("id", "type"), current=current)
 
-        # Delete first to ensure a clean update
-        client.delete(f"/api/agent_builder/agents/{agent_id}")
+    if resp is None:
+        logger.info(f"  = Tool {tool_id} unchanged")
+    elif resp.status_code in (200, 201):
+        logger.info(f"  ✓ Tool {tool_id} registered successfully")
+    else:
+        logger.error(f"  ✗ Failed to register {tool_id}: {resp.status_code} {resp.text}")
 
-        # Create
-        resp = client.post("/api/agent_builder/agents", json=payload)
 
-        if resp.status_code in (200, 201):
-            logger.info(f"  ✓ Agent {agent_id} registered successfully")
-        else:
-            logger.error(f"  ✗ Failed to register {agent_id}: {resp.status_code} {resp.text}")
+async def register_tools(client: httpx.AsyncClient, tools: list[dict], current: dict):
+    """Register all ES|QL tools concurrently; `current` is the registered {id: definition}."""
+    await asyncio.gather(*(register_tool(client, tool, current.get(tool["toolId"])) for tool in tools))
 
 
-def verify_setup(client: httpx.Client):
-    """Verify all tools and agents are registered."""
-    logger.info("Verifying setup...")
+async def register_agent(client: httpx.AsyncClient, agent: dict, current: Optional[dict] = None):
+    """Register one custom agent via Kibana API."""
+    agent_id = agent["agentId"]
+    logger.info(f"Registering agent: {agent_id}")
 
-    resp = client.get("/api/agent_builder/tools")
-    if resp.status_code == 200:
-        tools = resp.json()
-        logger.info(f"  Raw tools response type: {type(tools)}")
-        if isinstance(tools, list):
-            pharma_tools = []
-            for t in tools:
-                if isinstance(t, dict):
-                    tid = t.get("id", t.get("toolId", ""))
-                    if tid.startswith("pharma."):
-                        pharma_tools.append(t)
-                elif isinstance(t, str) and t.startswith("pharma."):
-                    pharma_tools.append(t)
-            logger.info(f"  Pharma tools registered: {len(pharma_tools)}/8")
-        elif isinstance(tools, dict) and "tools" in tools:
-            pharma_tools = [t for t in tools["tools"] if isinstance(t, dict) and t.get("id", "").startswith("pharma.")]
-            logger.info(f"  Pharma tools registered: {len(pharma_tools)}/8")
-        else:
-            logger.info(f"  Tools response: {str(tools)[:200]}")
+    configuration = {
+        "instructions": agent["instructions"],
+    }
+
+    # Include tools — empty array for agents with no tools (API requires the field)
+    if agent.get("tools"):
+        configuration["tools"] = [
+            { "tool_ids": agent["tools"] }
+        ]
     else:
-        logger.warning(f"  Could not list tools: {resp.status_code} {resp.text[:200]}")
-
-    resp = client.get("/api/agent_builder/agents")
-    if resp.status_code == 200:
-        agents = resp.json()
-        logger.info(f"  Raw agents response type: {type(agents)}")
-        if isinstance(agents, list):
-            our_agents = []
-            for a in agents:
-                if isinstance(a, dict):
-                    aid = a.get("id", a.get("agentId", ""))
-                    if aid in ("master_orchestrator", "signal_scanner", "case_investigator", "safety_reporter"):
-                        our_agents.append(a)
-                elif isinstance(a, str) and a in ("master_orchestrator", "signal_scanner", "case_investigator", "safety_reporter"):
-                    our_agents.append(a)
-            logger.info(f"  SignalShield agents registered: {len(our_agents)}/4")
-        elif isinstance(agents, dict) and "agents" in agents:
-            our_agents = [a for a in agents["agents"] if isinstance(a, dict) and a.get("id", "") in ("master_orchestrator", "signal_scanner", "case_investigator", "safety_reporter")]
-            logger.info(f"  SignalShield agents registered: {len(our_agents)}/4")
-        else:
-            logger.info(f"  Agents response: {str(agents)[:200]}")
+        configuration["tools"] = []
+
+    payload = {
+        "id": agent_id,
+        "name": agent["displayName"],
+        "description": agent["displayDescription"],
+        "avatar_color": agent.get("avatarColor", "#4ECDC4"),
+        "avatar_symbol": agent.get("avatarSymbol", "🤖"),
+        "configuration": configuration,
+    }
+
+    if "labels" in agent:
+        payload["labels"] = agent["labels"]
+
+    resp = await _upsert(client, "agents", agent_id, payload, immutable=("id",), current=current)
+
+    if resp is None:
+        logger.info(f"  = Agent {agent_id} unchanged")
+    elif resp.status_code in (200, 201):
+        logger.info(f"  ✓ Agent {agent_id} registered successfully")
     else:
-        logger.warning(f"  Could not list agents: {resp.status_code} {resp.text[:200]}")
+        logger.error(f"  ✗ Failed to register {agent_id}: {resp.status_code} {resp.text}")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Register SignalShield tools and agents")
-    parser.add_argument("--kibana-url", required=True, help="Kibana URL")
-    parser.add_argument("--api-key", required=True, help="Kibana API key")
-    args = parser.parse_args()
+async def register_agents(client: httpx.AsyncClient, agents: list[dict], current: dict):
+    """Register all custom agents concurrently; `current` is the registered {id: definition}."""
+    await asyncio.gather(*(register_agent(client, agent, current.get(agent["agentId"])) for agent in agents))
+
+
+async def verify_setup(client: httpx.AsyncClient, expected_tool_ids: set, expected_agent_ids: set):
+    """Verify all tools and agents are registered."""
+    logger.info("Verifying setup...")
+
+    tools, agents = await asyncio.gather(_list(client, "tools"), _list(client, "agents"))
+    logger.info(f"  Pharma tools registered: {len(expected_tool_ids & tools.keys())}/{len(expected_tool_ids)}")
+    logger.info(f"  SignalShield agents registered: {len(expected_agent_ids & agents.keys())}/{len(expected_agent_ids)}")
+
 
-    client = httpx.Client(
-        base_url=args.kibana_url.rstrip("/"),
+async def setup(kibana_url: str, api_key: str):
+    """Register every tool, then every agent (agents reference the tools), then verify."""
+    async with httpx.AsyncClient(
+        base_url=kibana_url.rstrip("/"),
         headers={
-            "Authorization": f"ApiKey {args.api_key}",
+            "Authorization": f"ApiKey {api_key}",
             "kbn-xsrf": "true",
             "Content-Type": "application/json",
         },
         timeout=30.0,
-    )
+        # HTTP/2: concurrent registrations share one TLS connection;
+        # retries cover connection failures before any response arrives
+        transport=httpx.AsyncHTTPTransport(http2=True, retries=3),
+    ) as client:
+        # Load definitions
+        tools_config = load_json("tools.json")
+        agents_config = load_json("agents.json")
+
+        # Register, skipping definitions that are already up to date
+        current_tools, current_agents = await asyncio.gather(_list(client, "tools"), _list(client, "agents"))
+        await register_tools(client, tools_config["tools"], current_tools)
+        await register_agents(client, agents_config["agents"], current_agents)
+
+        # Verify
+        await verify_setup(
+            client,
+            expected_tool_ids={t["toolId"] for t in tools_config["tools"]},
+            expected_agent_ids={a["agentId"] for a in agents_config["agents"]},
+        )
 
-    # Load definitions
-    tools_config = load_json("tools.json")
-    agents_config = load_json("agents.json")
+    logger.info("Setup complete!")
 
-    # Register
-    register_tools(client, tools_config["tools"])
-    register_agents(client, agents_config["agents"])
 
-    # Verify
-    verify_setup(client)
+def main():
+    parser = argparse.ArgumentParser(description="Register SignalShield tools and agents")
+    parser.add_argument("--kibana-url", required=True, help="Kibana URL")
+    parser.add_argument("--api-key", required=True, help="Kibana API key")
+    args = parser.parse_args()
 
-    logger.info("Setup complete!")
-    client.close()
+    asyncio.run(setup(args.kibana_url, args.api_key))
 
 
 if __name__ == "__main__":
@@ -1,14 +1,33 @@
-from elasticsearch import Elasticsearch
-
-es = Elasticsearch(
-    "https://my-elasticsearch-project-a4024e.es.asia-south1.gcp.elastic.cloud:443",
-    api_key="OERua1U1d0JDTElhRW8zSk94VUI6NTdEY3BRbHRTMjlOWVRBWktaMG02dw=="
-)
-
-try:
-    info = es.info()
-    print("✅ Connected to Elasticsearch!")
-    print(f"   Cluster: {info['cluster_name']}")
-    print(f"   Version: {info['version']['number']}")
-except Exception as e:
-    print(f"❌ Connection failed: {e}")
+import asyncio
+
+from elasticsearch import AsyncElasticsearch
+
+# (url, api_key) pairs to probe; all are checked concurrently
+ENDPOINTS = [
+    (
+        "https://my-elasticsearch-project-a4024e.es.asia-south1.gcp.elastic.cloud:443",
+        "OERua1U1d0JDTElhRW8zSk94VUI6NTdEY3BRbHRTMjlOWVRBWktaMG02dw==",
+    ),
+]
+
+
+async def probe(url: str, api_key: str):
+    async with AsyncElasticsearch(url, api_key=api_key, http_compress=True, request_timeout=10) as es:
+        return await es.info()
+
+
+async def main():
+    results = await asyncio.gather(
+        *(probe(url, api_key) for url, api_key in ENDPOINTS),
+        return_exceptions=True,
+    )
+    for (url, _), info in zip(ENDPOINTS, results):
+        if isinstance(info, Exception):
+            print(f"❌ Connection failed ({url}): {info}")
+        else:
+            print("✅ Connected to Elasticsearch!")
+            print(f"   Cluster: {info['cluster_name']}")
+            print(f"   Version: {info['version']['number']}")
+
+
+asyncio.run(main())
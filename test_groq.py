@@ -5,19 +5,22 @@ from dotenv import load_dotenv
 load_dotenv()
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
 
-response = httpx.post(
-    "https://api.groq.com/openai/v1/chat/completions",
+with httpx.Client(
+    base_url="https://api.groq.com",
     headers={
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json",
     },
-    json={
-        "model": "llama-3.3-70b-versatile",
-        "messages": [{"role": "user", "content": "Say hello in one sentence."}],
-        "max_tokens": 50,
-    },
     timeout=15.0,
-)
+) as client:
+    response = client.post(
+        "/openai/v1/chat/completions",
+        json={
+            "model": "llama-3.3-70b-versatile",
+            "messages": [{"role": "user", "content": "Say hello in one sentence."}],
+            "max_tokens": 50,
+        },
+    )
 
 if response.status_code == 200:
     data = response.json()
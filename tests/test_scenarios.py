@@ -21,8 +21,16 @@ Usage:
     python tests/test_scenarios.py --category rag
     python tests/test_scenarios.py --category all
 
+    # Also append each result to a JSONL file as it happens (survives a
+    # killed or timed-out CI run):
+    python tests/test_scenarios.py --results-file results.jsonl
+
+    # When stdout is not a terminal (CI, pipes), stdout carries only JSON:
+    # one line per result and a final {"summary": ...} line. Banners,
+    # headers and the readable summary go to stderr.
+
 Requirements:
-    pip install httpx websockets
+    pip install "httpx[http2]" websockets
 """
 
 import asyncio
@@ -30,13 +38,24 @@ import json
 import time
 import argparse
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import httpx
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # Optional: the stdlib parser is slower but equivalent here
+    json_loads = json.loads
+
 API_BASE = "http://localhost:8000"
 WS_BASE = "ws://localhost:8000"
 
+# Fields every detected signal must carry, and the report sections looked for
+_REQUIRED_SIGNAL_FIELDS = frozenset({"drug_name", "reaction_term", "prr", "case_count", "priority"})
+_REPORT_SECTIONS = ("Executive Summary", "Signal", "Demographics", "Risk")
+
 # ── Test Utilities ──────────────────────────────────────────
 
 class TestResult:
@@ -52,40 +71,162 @@ class TestResult:
         detail_str = f"\n      {self.details}" if self.details else ""
         return f"  {icon} {self.name}{time_str}{detail_str}"
 
+    def to_json(self) -> str:
+        return json.dumps({
+            "name": self.name, "passed": self.passed, "details": self.details, "duration": self.duration,
+        })
+
 
 results: list[TestResult] = []
+_LOG_LOCK = threading.Lock()  # Categories may log from several threads
+_results_file = None  # Line-buffered JSONL sink, opened by --results-file
+_PRETTY = sys.stdout.isatty()  # Piped/CI output gets one compact JSON line per result
 
 
 def log_test(name: str, passed: bool, details: str = "", duration: float = 0):
     result = TestResult(name, passed, details, duration)
-    results.append(result)
-    print(result)
+    with _LOG_LOCK:
+        results.append(result)
+        print(result if _PRETTY else result.to_json())
+        if _results_file:
+            _results_file.write(result.to_json() + "\n")
 
 
-def investigate_and_wait(client: httpx.Client, query: str, timeout: int = 120) -> dict:
-    """Submit a query and poll until complete."""
-    start = time.time()
+def say(*args):
+    """Print banner, header and summary text: to stdout on a terminal, to
+    stderr otherwise so piped stdout stays pure JSON lines."""
+    with _LOG_LOCK:
+        print(*args, file=sys.stdout if _PRETTY else sys.stderr)
+
+
+# Investigations started this run, by normalized query: cases in different
+# categories that send the same query share one backend investigation
+_started: dict[str, str] = {}
+_STARTED_LOCK = threading.Lock()
+
+
+async def start_investigation(client: httpx.AsyncClient, query: str) -> str:
+    """Return the investigation ID for query, only POSTing if no earlier case
+    in this run sent the same query. Raises httpx.HTTPStatusError if the
+    backend refuses to start it."""
+    key = " ".join(query.lower().split())
+    with _STARTED_LOCK:
+        inv_id = _started.get(key)
+    if inv_id:
+        return inv_id
+
+    resp = await client.post("/api/investigate", json={"query": query})
+    resp.raise_for_status()
+    with _STARTED_LOCK:
+        return _started.setdefault(key, resp.json()["investigation_id"])
+
+
+async def watch_progress(inv_id: str, until, timeout: float):
+    """Read an investigation's progress frames until until(frame data)
+    returns something truthy, and return that value (None if the socket
+    closes first).
+
+    The whole wait is bounded by one asyncio.wait_for, so the coroutine just
+    blocks on the socket; raises asyncio.TimeoutError when time runs out.
+    """
+    import websockets
+
+    async def _consume():
+        async with websockets.connect(f"{WS_BASE}/ws/progress/{inv_id}", close_timeout=5) as ws:
+            async for msg in ws:
+                value = until(json_loads(msg).get("data", {}))
+                if value:
+                    return value
+        return None
+
+    return await asyncio.wait_for(_consume(), timeout)
+
+
+async def investigate_and_wait_async(client: httpx.AsyncClient, query: str, timeout: int = 120) -> dict:
+    """Submit a query and wait for its completion push on the progress WebSocket.
+
+    The WebSocket sends the current state on connect and a progress frame
+    per node, so a finished investigation is noticed immediately (even one
+    that completed before the socket opened); one GET then fetches the
+    full result.
+    """
+    start = time.monotonic()
 
     # Start investigation
-    resp = client.post(f"{API_BASE}/api/investigate", json={"query": query})
+    try:
+        inv_id = await start_investigation(client, query)
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Failed to start: {e.response.status_code}", "duration": time.monotonic() - start}
+
+    # Wait for a terminal status
+    try:
+        await watch_progress(
+            inv_id,
+            lambda data: data.get("status") in ("complete", "error"),
+            timeout=max(timeout - (time.monotonic() - start), 0),
+        )
+    except asyncio.TimeoutError:
+        return {"error": "Timeout", "duration": time.monotonic() - start}
+
+    resp = await client.get(f"/api/investigations/{inv_id}")
     if resp.status_code != 200:
-        return {"error": f"Failed to start: {resp.status_code}", "duration": time.time() - start}
+        return {"error": f"Failed to fetch: {resp.status_code}", "duration": time.monotonic() - start}
+    inv = json_loads(resp.content)
+    inv["duration"] = time.monotonic() - start
+    return inv
 
-    data = resp.json()
-    inv_id = data["investigation_id"]
 
-    # Poll for completion
-    while time.time() - start < timeout:
-        time.sleep(2)
-        resp = client.get(f"{API_BASE}/api/investigations/{inv_id}")
-        if resp.status_code != 200:
-            continue
-        inv = resp.json()
-        if inv.get("status") in ("complete", "error"):
-            inv["duration"] = time.time() - start
-            return inv
+def investigate_and_wait(client: httpx.Client, query: str, timeout: int = 120) -> dict:
+    """Synchronous wrapper around investigate_and_wait_async."""
+    async def _run():
+        async with async_client(timeout=client.timeout) as aclient:
+            return await investigate_and_wait_async(aclient, query, timeout)
+
+    return asyncio.run(_run())
+
+
+async def wait_for_route(inv_id: str, timeout: float = 30) -> str:
+    """Return the route chosen for an investigation, read off the progress
+    WebSocket ("unknown" on timeout).
+
+    The master node's progress frame carries the route, and the current-state
+    frame sent on connect covers routing that finished before the socket
+    opened, so this returns as soon as the decision exists.
+    """
+    try:
+        return await watch_progress(inv_id, lambda data: data.get("route"), timeout) or "unknown"
+    except asyncio.TimeoutError:
+        return "unknown"
+
+
+# Cases within a category are independent, so they run concurrently, at most
+# this many at a time so the backend is not flooded
+CASE_CONCURRENCY = 8
 
-    return {"error": "Timeout", "duration": time.time() - start}
+
+def async_client(timeout=120.0) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=API_BASE,
+        timeout=timeout,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=32, keepalive_expiry=60),
+    )
+
+
+async def run_cases(case_fn, cases: list) -> None:
+    """Run case_fn(client, *case) for every case concurrently; each returns
+    log_test arguments, which are logged in case order."""
+    slots = asyncio.Semaphore(CASE_CONCURRENCY)
+
+    async with async_client() as client:
+        async def _run(case):
+            async with slots:
+                return await case_fn(client, *case)
+
+        outcomes = await asyncio.gather(*(_run(case) for case in cases))
+
+    for outcome in outcomes:
+        log_test(*outcome)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -93,11 +234,19 @@ def investigate_and_wait(client: httpx.Client, query: str, timeout: int = 120) -
 # ═══════════════════════════════════════════════════════════
 
 def test_api_health(client: httpx.Client):
-    print("\n🏥 === API Health & Connectivity ===\n")
+    say("\n🏥 === API Health & Connectivity ===\n")
+
+    # The four endpoints are independent, so fetch them all at once; each
+    # check below picks up its own response (or exception)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        health, root, listing, missing = (
+            pool.submit(client.get, path)
+            for path in ("/api/health", "/", "/api/investigations", "/api/investigations/INVALID-ID-12345")
+        )
 
     # Test 1.1: Health endpoint
     try:
-        resp = client.get(f"{API_BASE}/api/health")
+        resp = health.result()
         data = resp.json()
         log_test(
             "Health endpoint returns 200",
@@ -109,7 +258,7 @@ def test_api_health(client: httpx.Client):
 
     # Test 1.2: Root endpoint
     try:
-        resp = client.get(f"{API_BASE}/")
+        resp = root.result()
         data = resp.json()
         log_test(
             "Root endpoint returns welcome message",
@@ -121,7 +270,7 @@ def test_api_health(client: httpx.Client):
 
     # Test 1.3: Investigations list
     try:
-        resp = client.get(f"{API_BASE}/api/investigations")
+        resp = listing.result()
         log_test(
             "Investigations list endpoint works",
             resp.status_code == 200,
@@ -132,7 +281,7 @@ def test_api_health(client: httpx.Client):
 
     # Test 1.4: Invalid investigation ID returns 404
     try:
-        resp = client.get(f"{API_BASE}/api/investigations/INVALID-ID-12345")
+        resp = missing.result()
         log_test(
             "Invalid investigation ID returns 404",
             resp.status_code == 404,
@@ -147,7 +296,7 @@ def test_api_health(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_routing(client: httpx.Client):
-    print("\n🧠 === Master Orchestrator Routing ===\n")
+    say("\n🧠 === Master Orchestrator Routing ===\n")
 
     routing_tests = [
         # (query, expected_route, description)
@@ -160,35 +309,27 @@ def test_routing(client: httpx.Client):
         ("What is the weather today?", "out_of_scope", "Out-of-scope query"),
     ]
 
-    for query, expected_route, desc in routing_tests:
-        start = time.time()
-        try:
-            resp = client.post(f"{API_BASE}/api/investigate", json={"query": query})
-            data = resp.json()
-            inv_id = data["investigation_id"]
+    asyncio.run(run_cases(_routing_case, routing_tests))
+
 
-            # Wait for routing to complete
-            actual_route = "unknown"
-            for _ in range(15):
-                time.sleep(2)
-                inv = client.get(f"{API_BASE}/api/investigations/{inv_id}").json()
-                if inv.get("status") != "routing" and inv.get("route"):
-                    actual_route = inv.get("route")
-                    break
+async def _routing_case(client: httpx.AsyncClient, query: str, expected_route: str, desc: str):
+    start = time.monotonic()
+    try:
+        inv_id = await start_investigation(client, query)
 
-            duration = time.time() - start
+        # Wait for the routing decision (up to 30s)
+        actual_route = await wait_for_route(inv_id, timeout=30)
 
-            log_test(
-                f"[{desc}] → route={expected_route}",
-                actual_route == expected_route,
-                f"Query: \"{query[:50]}...\" → Got: {actual_route}",
-                duration
-            )
-        except Exception as e:
-            log_test(f"[{desc}] → route={expected_route}", False, str(e))
-        
-        # Small delay between tests to avoid rate limiting
-        time.sleep(1)
+        duration = time.monotonic() - start
+
+        return (
+            f"[{desc}] → route={expected_route}",
+            actual_route == expected_route,
+            f"Query: \"{query[:50]}...\" → Got: {actual_route}",
+            duration
+        )
+    except Exception as e:
+        return (f"[{desc}] → route={expected_route}", False, str(e))
 
 
 # ═══════════════════════════════════════════════════════════
@@ -196,7 +337,7 @@ def test_routing(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_rag(client: httpx.Client):
-    print("\n📚 === RAG Knowledge Base ===\n")
+    say("\n📚 === RAG Knowledge Base ===\n")
 
     rag_tests = [
         # (query, expected_keywords_in_response, description)
@@ -242,36 +383,37 @@ def test_rag(client: httpx.Client):
         ),
     ]
 
-    for query, expected_keywords, desc in rag_tests:
-        start = time.time()
-        try:
-            inv = investigate_and_wait(client, query, timeout=90)
-            duration = inv.get("duration", time.time() - start)
+    asyncio.run(run_cases(_rag_case, rag_tests))
 
-            if "error" in inv:
-                log_test(f"[{desc}]", False, f"Error: {inv['error']}", duration)
-                continue
 
-            response = inv.get("direct_response", "")
-            response_lower = response.lower()
+async def _rag_case(client: httpx.AsyncClient, query: str, expected_keywords: list[str], desc: str):
+    start = time.monotonic()
+    try:
+        inv = await investigate_and_wait_async(client, query, timeout=90)
+        duration = inv.get("duration", time.monotonic() - start)
 
-            # Check how many expected keywords are present
-            found = [kw for kw in expected_keywords if kw.lower() in response_lower]
-            missing = [kw for kw in expected_keywords if kw.lower() not in response_lower]
+        if "error" in inv:
+            return (f"[{desc}]", False, f"Error: {inv['error']}", duration)
 
-            passed = len(found) >= len(expected_keywords) * 0.6  # At least 60% keywords found
+        response = inv.get("direct_response", "")
+        response_lower = response.lower()
 
-            log_test(
-                f"[{desc}]",
-                passed,
-                f"Keywords found: {found} | Missing: {missing} | Response length: {len(response)} chars",
-                duration
-            )
+        # Check how many expected keywords are present (one scan per keyword)
+        found, missing = [], []
+        for kw in expected_keywords:
+            (found if kw.lower() in response_lower else missing).append(kw)
+
+        passed = len(found) >= len(expected_keywords) * 0.6  # At least 60% keywords found
 
-        except Exception as e:
-            log_test(f"[{desc}]", False, str(e))
+        return (
+            f"[{desc}]",
+            passed,
+            f"Keywords found: {found} | Missing: {missing} | Response length: {len(response)} chars",
+            duration
+        )
 
-        time.sleep(1)
+    except Exception as e:
+        return (f"[{desc}]", False, str(e))
 
 
 # ═══════════════════════════════════════════════════════════
@@ -279,7 +421,7 @@ def test_rag(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_out_of_scope(client: httpx.Client):
-    print("\n🔒 === Out-of-Scope Query Handling ===\n")
+    say("\n🔒 === Out-of-Scope Query Handling ===\n")
 
     oos_queries = [
         ("What is the weather today?", "Weather question"),
@@ -288,37 +430,38 @@ def test_out_of_scope(client: httpx.Client):
         ("Write me a poem about trees", "Creative writing"),
     ]
 
-    for query, desc in oos_queries:
-        start = time.time()
-        try:
-            inv = investigate_and_wait(client, query, timeout=60)
-            duration = inv.get("duration", time.time() - start)
+    asyncio.run(run_cases(_out_of_scope_case, oos_queries))
 
-            if "error" in inv:
-                log_test(f"[{desc}] → Out of scope", False, f"Error: {inv['error']}", duration)
-                continue
 
-            response = inv.get("direct_response", "")
-            route = inv.get("route", "")
+async def _out_of_scope_case(client: httpx.AsyncClient, query: str, desc: str):
+    start = time.monotonic()
+    try:
+        inv = await investigate_and_wait_async(client, query, timeout=60)
+        duration = inv.get("duration", time.monotonic() - start)
 
-            is_oos = (
-                route == "out_of_scope" or
-                "out of scope" in response.lower() or
-                "outside" in response.lower() or
-                "SignalShield" in response
-            )
+        if "error" in inv:
+            return (f"[{desc}] → Out of scope", False, f"Error: {inv['error']}", duration)
 
-            log_test(
-                f"[{desc}] → Redirected correctly",
-                is_oos,
-                f"Route: {route} | Has redirect msg: {'SignalShield' in response}",
-                duration
-            )
+        response = inv.get("direct_response", "")
+        route = inv.get("route", "")
+        response_lower = response.lower()
+
+        is_oos = (
+            route == "out_of_scope" or
+            "out of scope" in response_lower or
+            "outside" in response_lower or
+            "SignalShield" in response
+        )
 
-        except Exception as e:
-            log_test(f"[{desc}] → Out of scope", False, str(e))
+        return (
+            f"[{desc}] → Redirected correctly",
+            is_oos,
+            f"Route: {route} | Has redirect msg: {'SignalShield' in response}",
+            duration
+        )
 
-        time.sleep(1)
+    except Exception as e:
+        return (f"[{desc}] → Out of scope", False, str(e))
 
 
 # ═══════════════════════════════════════════════════════════
@@ -326,13 +469,13 @@ def test_out_of_scope(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_full_investigation(client: httpx.Client):
-    print("\n🔬 === Full Investigation Pipeline ===\n")
+    say("\n🔬 === Full Investigation Pipeline ===\n")
 
     # Test 5.1: Full scan
-    start = time.time()
+    start = time.monotonic()
     try:
         inv = investigate_and_wait(client, "Scan for any emerging drug safety signals", timeout=300)
-        duration = inv.get("duration", time.time() - start)
+        duration = inv.get("duration", time.monotonic() - start)
 
         if "error" in inv:
             log_test("Full scan completes", False, f"Error: {inv['error']}", duration)
@@ -351,7 +494,7 @@ def test_full_investigation(client: httpx.Client):
             # Check signals have required fields
             if signals:
                 sig = signals[0]
-                has_fields = all(k in sig for k in ["drug_name", "reaction_term", "prr", "case_count", "priority"])
+                has_fields = _REQUIRED_SIGNAL_FIELDS.issubset(sig)
                 log_test(
                     "Signals have required fields",
                     has_fields,
@@ -372,10 +515,10 @@ def test_full_investigation(client: httpx.Client):
         log_test("Full scan completes", False, str(e))
 
     # Test 5.2: Drug-specific investigation
-    start = time.time()
+    start = time.monotonic()
     try:
         inv = investigate_and_wait(client, "Investigate Cardizol-X for cardiac safety signals", timeout=180)
-        duration = inv.get("duration", time.time() - start)
+        duration = inv.get("duration", time.monotonic() - start)
 
         if "error" in inv:
             log_test("Drug investigation completes (Cardizol-X)", False, f"Error: {inv['error']}", duration)
@@ -407,37 +550,37 @@ def test_full_investigation(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_data_query(client: httpx.Client):
-    print("\n📊 === Data Query Pipeline ===\n")
+    say("\n📊 === Data Query Pipeline ===\n")
 
     data_queries = [
         ("How many adverse events for Neurofen-Plus?", "count", "Event count query"),
         ("Show top drugs by adverse event count", "top", "Top drugs query"),
     ]
 
-    for query, expected_keyword, desc in data_queries:
-        start = time.time()
-        try:
-            inv = investigate_and_wait(client, query, timeout=90)
-            duration = inv.get("duration", time.time() - start)
+    asyncio.run(run_cases(_data_query_case, data_queries))
 
-            if "error" in inv:
-                log_test(f"[{desc}]", False, f"Error: {inv['error']}", duration)
-                continue
 
-            response = inv.get("direct_response", "")
-            has_data = bool(response) and len(response) > 20
+async def _data_query_case(client: httpx.AsyncClient, query: str, expected_keyword: str, desc: str):
+    start = time.monotonic()
+    try:
+        inv = await investigate_and_wait_async(client, query, timeout=90)
+        duration = inv.get("duration", time.monotonic() - start)
 
-            log_test(
-                f"[{desc}] → Returns data",
-                has_data,
-                f"Response length: {len(response)} chars | Route: {inv.get('route')}",
-                duration
-            )
+        if "error" in inv:
+            return (f"[{desc}]", False, f"Error: {inv['error']}", duration)
 
-        except Exception as e:
-            log_test(f"[{desc}]", False, str(e))
+        response = inv.get("direct_response", "")
+        has_data = bool(response) and len(response) > 20
 
-        time.sleep(1)
+        return (
+            f"[{desc}] → Returns data",
+            has_data,
+            f"Response length: {len(response)} chars | Route: {inv.get('route')}",
+            duration
+        )
+
+    except Exception as e:
+        return (f"[{desc}]", False, str(e))
 
 
 # ═══════════════════════════════════════════════════════════
@@ -445,12 +588,12 @@ def test_data_query(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_report_generation(client: httpx.Client):
-    print("\n📝 === Report Generation Pipeline ===\n")
+    say("\n📝 === Report Generation Pipeline ===\n")
 
-    start = time.time()
+    start = time.monotonic()
     try:
         inv = investigate_and_wait(client, "Generate safety report for Arthrex-200", timeout=180)
-        duration = inv.get("duration", time.time() - start)
+        duration = inv.get("duration", time.monotonic() - start)
 
         if "error" in inv:
             log_test("Report generation completes", False, f"Error: {inv['error']}", duration)
@@ -469,13 +612,13 @@ def test_report_generation(client: httpx.Client):
                 markdown = rpt.get("report_markdown", "")
 
                 # Check report has key sections
-                sections = ["Executive Summary", "Signal", "Demographics", "Risk"]
-                found_sections = [s for s in sections if s.lower() in markdown.lower()]
+                markdown_lower = markdown.lower()
+                found_sections = [s for s in _REPORT_SECTIONS if s.lower() in markdown_lower]
 
                 log_test(
                     "Report contains key regulatory sections",
                     len(found_sections) >= 2,
-                    f"Sections found: {found_sections} out of {sections}"
+                    f"Sections found: {found_sections} out of {list(_REPORT_SECTIONS)}"
                 )
 
                 log_test(
@@ -493,7 +636,7 @@ def test_report_generation(client: httpx.Client):
 # ═══════════════════════════════════════════════════════════
 
 def test_websocket(client: httpx.Client):
-    print("\n🔌 === WebSocket Real-time Progress ===\n")
+    say("\n🔌 === WebSocket Real-time Progress ===\n")
 
     try:
         import websockets
@@ -501,24 +644,24 @@ def test_websocket(client: httpx.Client):
         async def ws_test():
             # Start an investigation
             resp = client.post(
-                f"{API_BASE}/api/investigate",
+                "/api/investigate",
                 json={"query": "What is PRR?"}
             )
             data = resp.json()
             inv_id = data["investigation_id"]
 
             messages = []
-            start = time.time()
+            start = time.monotonic()
 
             try:
                 async with websockets.connect(
                     f"{WS_BASE}/ws/progress/{inv_id}",
                     close_timeout=5
                 ) as ws:
-                    while time.time() - start < 60:
+                    while time.monotonic() - start < 60:
                         try:
                             msg = await asyncio.wait_for(ws.recv(), timeout=30)
-                            parsed = json.loads(msg)
+                            parsed = json_loads(msg)
                             messages.append(parsed)
 
                             if parsed.get("data", {}).get("status") in ("complete", "error"):
@@ -530,7 +673,7 @@ def test_websocket(client: httpx.Client):
                 log_test("WebSocket connects successfully", False, str(e))
                 return
 
-            duration = time.time() - start
+            duration = time.monotonic() - start
 
             # Check we received messages
             log_test(
@@ -576,6 +719,17 @@ CATEGORIES = {
 }
 
 
+CATEGORY_WORKERS = 4
+
+
+def _safe_run(category: tuple, client: httpx.Client):
+    name, func = category
+    try:
+        func(client)
+    except Exception as e:
+        say(f"\n💥 Test category '{name}' crashed: {e}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="SignalShield AI — Scenario Tests")
     parser.add_argument(
@@ -589,28 +743,41 @@ def main():
         default="http://localhost:8000",
         help="Backend API URL"
     )
+    parser.add_argument(
+        "--results-file",
+        help="Append each result to this JSONL file as it is logged"
+    )
     args = parser.parse_args()
 
-    global API_BASE, WS_BASE
+    global API_BASE, WS_BASE, _results_file
+    if args.results_file:
+        _results_file = open(args.results_file, "a", buffering=1, encoding="utf-8")
+    if not _PRETTY:
+        sys.stdout.reconfigure(line_buffering=True)  # Stream results to CI logs as they land
     API_BASE = args.api_url.rstrip("/")
     WS_BASE = API_BASE.replace("http://", "ws://").replace("https://", "wss://")
 
-    print("=" * 64)
-    print("  🧪 SignalShield AI — Comprehensive Scenario Tests")
-    print(f"  📡 Target: {API_BASE}")
-    print(f"  🕐 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 64)
+    say("=" * 64)
+    say("  🧪 SignalShield AI — Comprehensive Scenario Tests")
+    say(f"  📡 Target: {API_BASE}")
+    say(f"  🕐 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    say("=" * 64)
 
     # Check connectivity first
-    client = httpx.Client(timeout=30.0)
+    client = httpx.Client(
+        base_url=API_BASE,
+        timeout=30.0,
+        http2=True,  # Multiplexes requests when the target is served over TLS
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=32, keepalive_expiry=60),
+    )
     try:
-        resp = client.get(f"{API_BASE}/api/health")
+        resp = client.get("/api/health")
         if resp.status_code != 200:
-            print(f"\n❌ Cannot reach API at {API_BASE}. Is the backend running?")
+            say(f"\n❌ Cannot reach API at {API_BASE}. Is the backend running?")
             sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Cannot reach API at {API_BASE}: {e}")
-        print("   Start the backend first: uvicorn app.api:app --reload --host 0.0.0.0 --port 8000")
+        say(f"\n❌ Cannot reach API at {API_BASE}: {e}")
+        say("   Start the backend first: uvicorn app.api:app --reload --host 0.0.0.0 --port 8000")
         sys.exit(1)
 
     # Determine which tests to run
@@ -626,34 +793,40 @@ def main():
     else:
         test_funcs = [CATEGORIES[args.category]]
 
-    # Run selected tests
-    total_start = time.time()
-    for name, func in test_funcs:
-        try:
-            func(client)
-        except Exception as e:
-            print(f"\n💥 Test category '{name}' crashed: {e}")
+    # Run selected tests (categories are independent, so a full run overlaps
+    # them; narrower runs stay serial for ordered output)
+    total_start = time.monotonic()
+    if args.category == "all":
+        with ThreadPoolExecutor(max_workers=CATEGORY_WORKERS) as pool:
+            list(pool.map(lambda category: _safe_run(category, client), test_funcs))
+    else:
+        for category in test_funcs:
+            _safe_run(category, client)
 
     # Print summary
-    total_duration = time.time() - total_start
+    total_duration = time.monotonic() - total_start
     passed = sum(1 for r in results if r.passed)
     failed = sum(1 for r in results if not r.passed)
     total = len(results)
 
-    print("\n" + "=" * 64)
-    print(f"  📊 RESULTS SUMMARY")
-    print(f"  ✅ Passed: {passed}/{total}")
-    print(f"  ❌ Failed: {failed}/{total}")
-    print(f"  ⏱️  Total time: {total_duration:.1f}s")
-    print("=" * 64)
+    say("\n" + "=" * 64)
+    say(f"  📊 RESULTS SUMMARY")
+    say(f"  ✅ Passed: {passed}/{total}")
+    say(f"  ❌ Failed: {failed}/{total}")
+    say(f"  ⏱️  Total time: {total_duration:.1f}s")
+    say("=" * 64)
 
     if failed > 0:
-        print("\n  Failed tests:")
+        say("\n  Failed tests:")
         for r in results:
             if not r.passed:
-                print(f"    ❌ {r.name}: {r.details}")
+                say(f"    ❌ {r.name}: {r.details}")
 
-    print()
+    say()
+    if not _PRETTY:
+        print(json.dumps({"summary": {
+            "passed": passed, "failed": failed, "total": total, "duration": total_duration,
+        }}))
     client.close()
     sys.exit(0 if failed == 0 else 1)
 